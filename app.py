@@ -12,7 +12,7 @@ from datetime import datetime, timedelta
 import yfinance as yf
 from hmm_signal_generator import HMMSignalGenerator
 from kelly_calculator import KellyCalculator
-from small_cap_screener import SmallCapScreener
+from small_cap_screener import SmallCapScreener, drain_screen_events
 from utils import format_percentage, format_number, validate_date_range, get_stock_data_cached, clear_stock_data_cache, format_currency
 from dark_terminal_styles import (
     get_dark_terminal_styles,
@@ -1144,50 +1144,63 @@ def small_cap_screener():
             st.toast("Stock universe rotated!")
             st.rerun()
     
-    if run_screen:
+    # The screen runs on a background thread; only the progress fragment
+    # reruns while it works, and it triggers one full rerun when it is done
+    if run_screen and 'screen_job' not in st.session_state:
+        st.session_state.screen_job = screener.submit_screen(criteria)
+        st.session_state.screen_progress = (0, 0, '')
+        st.session_state.screen_warnings = []
+    
+    if 'screen_job' in st.session_state and not st.session_state.screen_job[0].done():
+        screen_progress()
+    elif 'screen_job' in st.session_state:
+        future, events = st.session_state.pop('screen_job')
+        drain_screen_progress(events)
+        for message in st.session_state.pop('screen_warnings', []):
+            st.warning(message)
+        
         try:
-            with st.spinner("Screening small cap stocks... This may take a few minutes."):
-                results = screener.screen_stocks(criteria)
+            results = future.result()
+            
+            if not results.empty:
+                st.session_state.screening_results = results
                 
-                if results:
-                    st.session_state.screening_results = results
-                    
-                    st.success(f"Found {len(results)} stocks that meet your criteria!")
-                    
-                    # Format and display results
-                    results_df = screener.format_screening_results(results)
-                    
-                    st.subheader("Screening Results")
-                    st.dataframe(results_df, use_container_width=True)
-                    
-                    # Top picks
-                    if len(results) >= 3:
-                        st.subheader("Top 3 Picks")
-                        
-                        for i, stock in enumerate(results[:3]):
-                            with st.expander(f"#{i+1}: {stock['symbol']} - Score: {stock['screening_score']}/10"):
-                                display_stock_details(stock)
-                    
-                    # Export option
-                    st.subheader("Export Results")
-                    # Use CSV export format with proper number formatting
-                    csv_df = screener.format_csv_export(results)
-                    csv = csv_df.to_csv(index=False)
-                    st.download_button(
-                        label="Download Results as CSV",
-                        data=csv,
-                        file_name=f"small_cap_screen_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                        mime="text/csv"
-                    )
-                    
-                else:
-                    st.warning("No stocks met your screening criteria. Try adjusting the parameters.")
+                st.success(f"Found {len(results)} stocks that meet your criteria!")
+                
+                # Format and display results
+                results_df = screener.format_screening_results(results)
+                
+                st.subheader("Screening Results")
+                st.dataframe(results_df, use_container_width=True)
+                
+                # Top picks
+                if len(results) >= 3:
+                    st.subheader("Top 3 Picks")
                     
+                    for i, stock in enumerate(screener.top_picks(results, 3)):
+                        with st.expander(f"#{i+1}: {stock['symbol']} - Score: {stock['screening_score']}/10"):
+                            display_stock_details(stock)
+                
+                # Export option
+                st.subheader("Export Results")
+                # Use CSV export format with proper number formatting
+                csv_df = screener.format_csv_export(results)
+                csv = csv_df.to_csv(index=False)
+                st.download_button(
+                    label="Download Results as CSV",
+                    data=csv,
+                    file_name=f"small_cap_screen_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+                    mime="text/csv"
+                )
+                
+            else:
+                st.warning("No stocks met your screening criteria. Try adjusting the parameters.")
+                
         except Exception as e:
             st.error(f"Error during screening: {str(e)}")
     
     # Display previous results if available
-    if 'screening_results' in st.session_state and st.session_state.screening_results:
+    if 'screening_results' in st.session_state and len(st.session_state.screening_results):
         if st.button("Show Last Results"):
             results = st.session_state.screening_results
             results_df = screener.format_screening_results(results)
@@ -1207,6 +1220,32 @@ def small_cap_screener():
                 key="download_previous_results"
             )
 
+def drain_screen_progress(events):
+    """Move queued screen events into session state"""
+    for kind, payload in drain_screen_events(events):
+        if kind == 'progress':
+            st.session_state.screen_progress = payload
+        else:
+            st.session_state.screen_warnings.append(payload)
+
+@st.fragment(run_every=0.5)
+def screen_progress():
+    """Progress block for a running screen (reruns on its own every 0.5s)"""
+    future, events = st.session_state.screen_job
+    job_done = future.done()
+    drain_screen_progress(events)
+    
+    if job_done:
+        # Rerun the whole page so the results are rendered below
+        st.rerun()
+    
+    completed, total, symbol = st.session_state.screen_progress
+    with st.status("Screening small cap stocks... This may take a few minutes.", state="running"):
+        if total:
+            st.progress(completed / total, text=f"Analyzing {symbol}... ({completed}/{total})")
+        for message in st.session_state.screen_warnings:
+            st.warning(message)
+
 def display_stock_details(stock):
     """Display detailed information for a screened stock"""
     
@@ -13,6 +13,10 @@ class RunLogger:
     def __init__(self, log_path: str = 'out/run.log'):
         self.log_path = log_path
         os.makedirs(os.path.dirname(log_path), exist_ok=True)
+        
+        # One append-mode descriptor for the run; each entry is a single
+        # O_APPEND write, so nothing sits in a buffer (call close() when done)
+        self._fd = os.open(self.log_path, os.O_APPEND | os.O_CREAT | os.O_WRONLY, 0o644)
     
     def log_run(
         self,
@@ -30,6 +34,9 @@ class RunLogger:
             runtime_seconds: Total runtime in seconds
             error: Optional error message if run failed
         """
+        if self._fd is None:
+            raise ValueError("logger is closed")
+        
         timestamp = datetime.now().isoformat()
         
         if error:
@@ -44,16 +51,31 @@ class RunLogger:
                 f"Runtime: {runtime_seconds:.2f}s\n"
             )
         
-        with open(self.log_path, 'a') as f:
-            f.write(entry)
+        os.write(self._fd, entry.encode())
     
     def get_recent_logs(self, lines: int = 10) -> str:
         """Get recent log entries"""
         if not os.path.exists(self.log_path):
             return "No logs yet"
         
-        with open(self.log_path, 'r') as f:
-            all_lines = f.readlines()
+        # Read backwards in fixed-size chunks until enough lines are buffered
+        # (lines <= 0 slices the whole log: 0 returns all of it)
+        chunk_size = 4096
+        pos = os.path.getsize(self.log_path)
+        data = b''
         
-        recent = all_lines[-lines:]
-        return ''.join(recent)
+        with open(self.log_path, 'rb') as f:
+            while pos > 0 and (lines <= 0 or data.count(b'\n') <= lines):
+                read_size = min(chunk_size, pos)
+                pos -= read_size
+                f.seek(pos)
+                data = f.read(read_size) + data
+        
+        recent = data.splitlines(keepends=True)[-lines:]
+        return b''.join(recent).decode()
+    
+    def close(self):
+        """Release the log file descriptor"""
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
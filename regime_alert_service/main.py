@@ -48,6 +48,8 @@ def main():
         if not should_run:
             print(reason)
             logger.log_run(0, 0, 0.0, error=reason)
+            service.close()
+            logger.close()
             return
     
     # Start timing
@@ -60,7 +62,7 @@ def main():
         today_df, changes_df = service.detect_regimes()
         
         # Write outputs
-        service.write_outputs(today_df, changes_df)
+        service.write_outputs(today_df, changes_df, today_rows=service.today_rows)
         
         # Send alert
         service.send_alert(changes_df, force=args.force_alert)
@@ -86,6 +88,10 @@ def main():
         print(f"ERROR: {error_msg}")
         logger.log_run(0, 0, runtime, error=error_msg)
         raise
+    
+    finally:
+        service.close()
+        logger.close()
 
 
 if __name__ == '__main__':
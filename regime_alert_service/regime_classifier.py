@@ -6,7 +6,6 @@ Assigns Bull/Neutral/Bear labels to price series
 import numpy as np
 import pandas as pd
 from typing import Tuple, Optional
-from sklearn.mixture import GaussianMixture
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -44,23 +43,31 @@ class RegimeClassifier:
         3-state Gaussian HMM on daily returns
         Label states by mean return: lowest=Bear, middle=Neutral, highest=Bull
         """
-        # Calculate daily returns
-        returns = prices.pct_change().dropna()
+        # Calculate daily returns directly on the price buffer
+        p = prices.to_numpy(dtype=np.float64)
+        returns = np.diff(p) / p[:-1]
+        returns = returns[np.isfinite(returns)]
         
         # Need at least 60 days for reliable HMM
         if len(returns) < 60:
             raise ValueError("Insufficient data for HMM")
         
         # Prepare features for GMM (using as HMM approximation)
-        X = returns.values.reshape(-1, 1)
+        X = returns.reshape(-1, 1)
+        
+        # Imported lazily: sklearn is slow to load and unused on the MA fallback path
+        from sklearn.mixture import GaussianMixture
         
         # Fit 3-component Gaussian Mixture Model
+        # (1-D returns: 'diag' is equivalent to 'full' without the Cholesky work)
         gmm = GaussianMixture(
             n_components=self.n_states,
-            covariance_type='full',
-            max_iter=100,
+            covariance_type='diag',
+            max_iter=50,
+            tol=1e-3,
             random_state=42,
-            n_init=3
+            n_init=1,
+            init_params='k-means++'
         )
         gmm.fit(X)
         
@@ -4,18 +4,32 @@ Pulls prices, assigns regimes, detects changes, sends alerts
 """
 
 import os
+import csv
 import json
 import requests
 import yfinance as yf
+from curl_cffi import requests as curl_requests
+import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 from regime_classifier import RegimeClassifier
 
+try:
+    import orjson
+except ImportError:  # orjson is optional; stdlib json writes the same file
+    orjson = None
+
 
 class RegimeService:
     """Main service for regime detection and alerting"""
     
+    TODAY_COLUMNS = ['symbol', 'last_price', 'regime', 'confidence', 'timestamp']
+    
+    # 1-byte regime codes for the binary (.npz) state format
+    REGIME_CODES = {'Bear': 0, 'Neutral': 1, 'Bull': 2}
+    REGIME_LABELS = np.array(['Bear', 'Neutral', 'Bull'])
+    
     def __init__(
         self,
         universe_path: str = 'config/universe.txt',
@@ -26,16 +40,24 @@ class RegimeService:
         self.prev_state_path = prev_state_path
         self.output_dir = output_dir
         self.classifier = RegimeClassifier(lookback_months=9)
+        self.today_rows: List[Dict] = []
+        
+        # One keep-alive HTTP session shared by every ticker fetch so TLS
+        # handshakes are paid once per run (yfinance requires curl_cffi sessions)
+        self._session = curl_requests.Session(impersonate='chrome')
         
         # Ensure directories exist
         os.makedirs(os.path.dirname(prev_state_path), exist_ok=True)
         os.makedirs(output_dir, exist_ok=True)
     
+    def close(self):
+        """Release the shared HTTP session"""
+        self._session.close()
+    
     def load_universe(self) -> List[str]:
         """Load ticker symbols from universe file"""
         with open(self.universe_path, 'r') as f:
-            tickers = [line.strip() for line in f if line.strip()]
-        return tickers
+            return f.read().split()
     
     def fetch_prices(self, symbol: str, months: int = 9) -> pd.Series:
         """
@@ -47,7 +69,7 @@ class RegimeService:
         end_date = datetime.now()
         start_date = end_date - timedelta(days=months * 30)
         
-        ticker = yf.Ticker(symbol)
+        ticker = yf.Ticker(symbol, session=self._session)
         hist = ticker.history(start=start_date, end=end_date)
         
         if hist.empty:
@@ -58,17 +80,35 @@ class RegimeService:
         return prices
     
     def load_previous_regimes(self) -> Dict[str, str]:
-        """Load previous regime states from JSON"""
+        """Load previous regime states from JSON (or compact .npz)"""
         if not os.path.exists(self.prev_state_path):
             return {}
         
-        with open(self.prev_state_path, 'r') as f:
-            return json.load(f)
+        if self.prev_state_path.endswith('.npz'):
+            with np.load(self.prev_state_path) as npz:
+                labels = self.REGIME_LABELS[npz['regimes']]
+                return dict(zip(npz['symbols'].tolist(), labels.tolist()))
+        
+        with open(self.prev_state_path, 'rb') as f:
+            data = f.read()
+        return orjson.loads(data) if orjson is not None else json.loads(data)
     
     def save_regimes(self, regimes: Dict[str, str]):
-        """Save current regime states to JSON"""
-        with open(self.prev_state_path, 'w') as f:
-            json.dump(regimes, f, indent=2)
+        """Save current regime states to JSON (or compact .npz)"""
+        if self.prev_state_path.endswith('.npz'):
+            np.savez_compressed(
+                self.prev_state_path,
+                symbols=np.array(list(regimes.keys()), dtype=str),
+                regimes=np.array([self.REGIME_CODES[v] for v in regimes.values()], dtype=np.uint8)
+            )
+            return
+        
+        if orjson is not None:
+            data = orjson.dumps(regimes, option=orjson.OPT_INDENT_2)
+        else:
+            data = json.dumps(regimes, indent=2, ensure_ascii=False).encode()
+        with open(self.prev_state_path, 'wb') as f:
+            f.write(data)
     
     def detect_regimes(self) -> Tuple[pd.DataFrame, pd.DataFrame]:
         """
@@ -77,11 +117,11 @@ class RegimeService:
         Returns:
             Tuple of (today_regimes_df, changes_df)
         """
+        run_ts = datetime.now().isoformat()
         tickers = self.load_universe()
         previous_regimes = self.load_previous_regimes()
         
         results = []
-        changes = []
         current_regimes = {}
         
         for symbol in tickers:
@@ -102,20 +142,9 @@ class RegimeService:
                     'last_price': round(last_price, 2),
                     'regime': regime,
                     'confidence': round(confidence, 3),
-                    'timestamp': datetime.now().isoformat()
+                    'timestamp': run_ts
                 })
                 
-                # Check for regime change
-                if symbol in previous_regimes:
-                    prev_regime = previous_regimes[symbol]
-                    if prev_regime != regime:
-                        changes.append({
-                            'symbol': symbol,
-                            'from_regime': prev_regime,
-                            'to_regime': regime,
-                            'timestamp': datetime.now().isoformat()
-                        })
-                
             except Exception as e:
                 print(f"Error processing {symbol}: {e}")
                 continue
@@ -123,18 +152,66 @@ class RegimeService:
         # Save current regimes for next run
         self.save_regimes(current_regimes)
         
+        # Keep raw rows for the CSV fast path
+        self.today_rows = results
+        
         # Create DataFrames
         today_df = pd.DataFrame(results)
-        changes_df = pd.DataFrame(changes)
+        changes_df = self._diff_regimes(previous_regimes, current_regimes, run_ts)
         
         return today_df, changes_df
     
-    def write_outputs(self, today_df: pd.DataFrame, changes_df: pd.DataFrame):
-        """Write CSV outputs"""
+    def _diff_regimes(
+        self,
+        previous_regimes: Dict[str, str],
+        current_regimes: Dict[str, str],
+        timestamp: str
+    ) -> pd.DataFrame:
+        """
+        Compare current regimes against the prior run in one aligned pass
+        
+        Returns:
+            DataFrame with symbol, from_regime, to_regime, timestamp
+            (only symbols present in both runs whose regime flipped)
+        """
+        curr_s = pd.Series(current_regimes, name='to_regime', dtype=object)
+        prev_s = pd.Series(previous_regimes, name='from_regime', dtype=object).reindex(curr_s.index)
+        
+        merged = pd.concat([prev_s, curr_s], axis=1).dropna()
+        changes_df = (
+            merged[merged['from_regime'] != merged['to_regime']]
+            .rename_axis('symbol')
+            .reset_index()
+        )
+        changes_df['timestamp'] = timestamp
+        
+        return changes_df
+    
+    def write_outputs(
+        self,
+        today_df: pd.DataFrame,
+        changes_df: pd.DataFrame,
+        today_rows: Optional[List[Dict]] = None
+    ):
+        """
+        Write CSV outputs
+        
+        Args:
+            today_df: DataFrame with current regimes
+            changes_df: DataFrame with regime changes
+            today_rows: Optional raw result rows; written directly with
+                csv.DictWriter instead of going through today_df
+        """
         today_path = os.path.join(self.output_dir, 'today_regimes.csv')
         changes_path = os.path.join(self.output_dir, 'changes.csv')
         
-        today_df.to_csv(today_path, index=False)
+        if today_rows is not None:
+            with open(today_path, 'w', newline='') as f:
+                writer = csv.DictWriter(f, fieldnames=self.TODAY_COLUMNS)
+                writer.writeheader()
+                writer.writerows(today_rows)
+        else:
+            today_df.to_csv(today_path, index=False)
         print(f"Wrote {len(today_df)} regimes to {today_path}")
         
         if not changes_df.empty:
@@ -158,10 +235,12 @@ class RegimeService:
         if changes_df.empty:
             message = "No regime changes today"
         else:
-            lines = ["Regime changes:"]
-            for _, row in changes_df.iterrows():
-                lines.append(f"{row['symbol']}: {row['from_regime']} → {row['to_regime']}")
-            message = "\n".join(lines)
+            lines = (
+                changes_df['symbol'] + ': '
+                + changes_df['from_regime'] + ' → '
+                + changes_df['to_regime']
+            )
+            message = "Regime changes:\n" + "\n".join(lines)
         
         # Send or print
         if webhook_url:
@@ -182,11 +261,9 @@ class RegimeService:
             print("No regimes detected")
             return
         
-        # Count by regime
-        counts = today_df['regime'].value_counts()
-        bull = counts.get('Bull', 0)
-        neutral = counts.get('Neutral', 0)
-        bear = counts.get('Bear', 0)
+        # Count by regime (labels sorted: Bear, Bull, Neutral)
+        codes = np.searchsorted(np.array(['Bear', 'Bull', 'Neutral']), today_df['regime'].to_numpy(dtype=str))
+        bear, bull, neutral = np.bincount(codes, minlength=3)[:3]
         
         print("\n" + "="*50)
         print("REGIME SUMMARY")
@@ -7,6 +7,11 @@ from datetime import datetime
 from typing import Optional
 import pytz
 
+try:
+    import fcntl
+except ImportError:  # Windows: no flock, fall back to the last-run check only
+    fcntl = None
+
 
 class Scheduler:
     """Handles run timing and Sunday skip logic"""
@@ -14,6 +19,9 @@ class Scheduler:
     def __init__(self, timezone: str = 'America/Chicago'):
         self.timezone = pytz.timezone(timezone)
         self.last_run_file = 'data/last_run.txt'
+        self.lock_file = 'data/last_run.lock'
+        self._last_run_cache: Optional[str] = None
+        self._lock_fd: Optional[int] = None
     
     def should_run(self) -> tuple[bool, Optional[str]]:
         """
@@ -28,6 +36,10 @@ class Scheduler:
         if now.weekday() == 6:  # Sunday
             return False, "Sunday - skipping"
         
+        # Check if another run is in progress
+        if not self._acquire_lock():
+            return False, "Another run is in progress - skipping"
+        
         # Check if already ran today
         today_str = now.strftime('%Y-%m-%d')
         if self._already_ran_today(today_str):
@@ -35,15 +47,38 @@ class Scheduler:
         
         return True, None
     
-    def _already_ran_today(self, today_str: str) -> bool:
-        """Check if service already ran today"""
-        if not os.path.exists(self.last_run_file):
+    def _acquire_lock(self) -> bool:
+        """
+        Take an exclusive flock on the sentinel file for the process lifetime
+        
+        Returns False if another process already holds it. The lock is
+        released automatically when the process exits.
+        """
+        if fcntl is None or self._lock_fd is not None:
+            return True
+        
+        os.makedirs(os.path.dirname(self.lock_file), exist_ok=True)
+        fd = os.open(self.lock_file, os.O_CREAT | os.O_RDWR, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
             return False
         
-        with open(self.last_run_file, 'r') as f:
-            last_run = f.read().strip()
+        self._lock_fd = fd
+        return True
+    
+    def _already_ran_today(self, today_str: str) -> bool:
+        """Check if service already ran today (via last-run file mtime)"""
+        if self._last_run_cache is None:
+            try:
+                mtime = os.stat(self.last_run_file).st_mtime
+            except FileNotFoundError:
+                return False
+            
+            self._last_run_cache = datetime.fromtimestamp(mtime, self.timezone).strftime('%Y-%m-%d')
         
-        return last_run == today_str
+        return self._last_run_cache == today_str
     
     def mark_run_complete(self):
         """Record that service ran today"""
@@ -53,6 +88,8 @@ class Scheduler:
         
         with open(self.last_run_file, 'w') as f:
             f.write(today_str)
+        
+        self._last_run_cache = today_str
     
     def get_scheduled_times(self) -> list[str]:
         """Return configured run times"""
@@ -15,16 +15,43 @@ class InstitutionalDataLoader:
     def __init__(self, csv_path: str = 'data/institutional_holdings.csv'):
         self.csv_path = csv_path
         self.data = None
+        self._latest_by_ticker = {}
         self._load_data()
     
     def _load_data(self):
-        """Load CSV file"""
+        """Load CSV file and precompute Z_H for every ticker/quarter"""
         try:
             self.data = pd.read_csv(self.csv_path)
             self.data['quarter_end'] = pd.to_datetime(self.data['quarter_end'])
         except FileNotFoundError:
             print(f"Warning: {self.csv_path} not found. Institutional holdings disabled.")
             self.data = None
+            self._latest_by_ticker = {}
+            return
+        
+        # groupby drops NaN tickers, which would misalign the rolling stats
+        self.data = self.data.dropna(subset=['ticker'])
+        self.data = self.data.sort_values(['ticker', 'quarter_end']).reset_index(drop=True)
+        
+        # Quarterly % changes per ticker
+        pct = self.data.groupby('ticker')['inst_hold_pct'].pct_change()
+        self.data['pct_change'] = pct
+        
+        # Z-score of each change against its trailing 12-quarter window
+        rolling = self.data.groupby('ticker')['pct_change'].rolling(12, min_periods=1)
+        mean12 = rolling.mean().reset_index(level=0, drop=True)
+        std12 = rolling.std().reset_index(level=0, drop=True)
+        
+        z_h = np.where(std12 > 0, (pct - mean12) / std12, 0.0)
+        self.data['z_h'] = np.where(pct.isna(), np.nan, z_h)
+        
+        # Latest quarter, history length, and Z_H per ticker for O(1) lookups
+        latest = self.data.groupby('ticker').tail(1)
+        counts = self.data.groupby('ticker').size()
+        self._latest_by_ticker = {
+            t: (q, int(counts[t]), z)
+            for t, q, z in zip(latest['ticker'], latest['quarter_end'], latest['z_h'])
+        }
     
     def get_holdings_change(
         self,
@@ -38,44 +65,19 @@ class InstitutionalDataLoader:
         Returns:
             (Z_H value, is_stale)
         """
-        if self.data is None or ticker not in self.data['ticker'].values:
+        latest = self._latest_by_ticker.get(ticker)
+        if latest is None:
             return None, False
         
-        # Get ticker history
-        ticker_data = self.data[self.data['ticker'] == ticker].copy()
-        ticker_data = ticker_data.sort_values('quarter_end')
+        latest_quarter, n_quarters, z_h = latest
         
         # Check staleness
-        latest_quarter = ticker_data['quarter_end'].max()
         days_since_latest = (as_of_date - latest_quarter).days
         is_stale = days_since_latest > staleness_days
         
-        if is_stale or len(ticker_data) < 2:
-            return None, is_stale
-        
-        # Calculate quarterly % changes
-        ticker_data['pct_change'] = ticker_data['inst_hold_pct'].pct_change()
-        
-        # Get last 12 quarters for z-score window
-        if len(ticker_data) > 12:
-            window = ticker_data.tail(12)
-        else:
-            window = ticker_data
-        
-        # Calculate z-score of most recent change
-        recent_change = ticker_data['pct_change'].iloc[-1]
-        
-        if pd.isna(recent_change):
+        if is_stale or n_quarters < 2 or pd.isna(z_h):
             return None, is_stale
         
-        mean_change = window['pct_change'].mean()
-        std_change = window['pct_change'].std()
-        
-        if std_change == 0 or pd.isna(std_change):
-            z_h = 0.0
-        else:
-            z_h = (recent_change - mean_change) / std_change
-        
         return float(z_h), is_stale
 
 
@@ -5,9 +5,232 @@ Implements IFS scoring, posterior adjustment, Kelly scaling, and decision bands
 
 import numpy as np
 import pandas as pd
-from scipy import stats
-from typing import Dict, Tuple, Optional
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Mapping, Optional, Sequence, Tuple
 import json
+import os
+import warnings
+
+
+# Φ⁻¹(0.75): divides MAD so it estimates σ for normal data (scipy's scale='normal')
+_MAD_NORMAL_SCALE = 0.6744897501960817
+
+# Bars between full recomputes of IFOState running sums (bounds float drift)
+_STATE_REFRESH_BARS = 20
+
+# Minimum volume history for an RV z-score; shorter histories give NaN
+_RV_MIN_BARS = 100
+
+# Decision labels in band order (category codes 0..3 in get_decision_batch)
+_DECISIONS = ('Exit', 'Reduce', 'Maintain', 'Increase')
+
+
+@lru_cache(maxsize=None)
+def _ols_slope_weights(L: int) -> np.ndarray:
+    """
+    OLS slope weights for y observed at x = 0..L-1: slope = w @ y
+    
+    w = (x - mean(x)) / sum((x - mean(x))²). Depends only on L, so each
+    window length is built once and reused (read-only).
+    """
+    x = np.arange(L, dtype=np.float64)
+    xc = x - x.mean()
+    w = xc / (xc @ xc)
+    w.flags.writeable = False
+    return w
+
+
+def _clip(x: float, lo: float, hi: float) -> float:
+    """
+    Scalar clip without NumPy dispatch
+    
+    x goes first in max/min so a NaN propagates, as with np.clip.
+    """
+    return min(max(x, lo), hi)
+
+
+def _median(x: np.ndarray) -> float:
+    """
+    Median of a NaN-free 1-D array with a single np.partition
+    
+    Same value as np.median (mean of the two middle elements for even
+    sizes) without its dispatch and NaN-check overhead, which dominates
+    at the 120-bar window size.
+    """
+    n = x.size
+    half = n // 2
+    if n % 2:
+        return np.partition(x, half)[half]
+    part = np.partition(x, (half - 1, half))
+    return (part[half - 1] + part[half]) / 2
+
+
+def _ad_slope_kernel(
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    volume: np.ndarray,
+    L: int,
+    clip_min: float,
+    clip_max: float
+) -> float:
+    """
+    Fused A/D normalized slope on contiguous float64 arrays
+    
+    MFM → MFV → cumulative AD, OLS slope over the last L bars (cached weights),
+    normalized by the (normal-scaled) MAD of the full AD window and clipped.
+    """
+    mfm = ((close - low) - (high - close)) / np.maximum(high - low, 1e-6)
+    ad = np.cumsum(mfm * volume)
+    
+    # A NaN anywhere propagates to the end of the cumulative sum (MAD would be NaN)
+    if np.isnan(ad[-1]):
+        return 0.0
+    
+    # OLS slope over last L bars: one dot product with precomputed weights
+    slope = _ols_slope_weights(L) @ ad[-L:]
+    
+    # MAD via partition-based medians
+    med = _median(ad)
+    mad = _median(np.abs(ad - med)) / _MAD_NORMAL_SCALE
+    if mad == 0 or np.isnan(mad):
+        return 0.0
+    
+    return float(_clip(slope / mad, clip_min, clip_max))
+
+
+def _rv_stats(window: np.ndarray, short: int) -> Tuple[float, float, float]:
+    """
+    (mean of last `short` values, mean, sample std) of a volume window
+    
+    One sum plus one centered dot product over the contiguous buffer;
+    NaNs are skipped like the pandas reducers.
+    """
+    if np.isnan(window).any():
+        return (
+            float(np.nanmean(window[-short:])),
+            float(np.nanmean(window)),
+            float(np.nanstd(window, ddof=1))
+        )
+    
+    n = window.size
+    mean_long = window.sum() / n
+    centered = window - mean_long
+    std_long = np.sqrt((centered @ centered) / (n - 1))
+    mean_short = window[-short:].sum() / short
+    
+    return float(mean_short), float(mean_long), float(std_long)
+
+
+def _row_quantiles(window: np.ndarray, pcts) -> np.ndarray:
+    """
+    Linear-interpolated quantiles of each row of a NaN-free N×T matrix
+    
+    One np.partition call places every needed order statistic for all rows
+    (O(T) per row instead of a sort). Matches np.quantile's default method.
+    Returns shape (len(pcts), N, 1).
+    """
+    n = window.shape[1]
+    h = (n - 1) * np.asarray(pcts, dtype=np.float64)
+    lo = np.floor(h).astype(np.intp)
+    hi = np.minimum(lo + 1, n - 1)
+    part = np.partition(window, np.unique(np.concatenate([lo, hi])), axis=1)
+    
+    a, b = part[:, lo].T, part[:, hi].T
+    t = (h - lo)[:, np.newaxis]
+    out = np.where(t < 0.5, a + (b - a) * t, b - (b - a) * (1 - t))
+    return out[..., np.newaxis]
+
+
+def _ewm_recursive(x: np.ndarray, alpha: float) -> np.ndarray:
+    """
+    Non-adjusted EWM as a first-order IIR filter along the last axis
+    
+    y[0] = x[0]; y[i] = alpha * x[i] + (1 - alpha) * y[i-1]
+    (same as pandas ewm(alpha=alpha, adjust=False).mean() for NaN-free input).
+    A 2-D x filters every row in the same call.
+    """
+    from scipy.signal import lfilter  # ~0.6s import, only paid once smoothing is used
+    out, _ = lfilter([alpha], [1.0, alpha - 1.0], x, axis=-1, zi=(1.0 - alpha) * x[..., :1])
+    return out
+
+
+def _logit_shift(p: np.ndarray, ifs: np.ndarray, gamma: float) -> np.ndarray:
+    """
+    sigmoid(logit(p) + gamma * ifs), vectorized and numerically stable
+    
+    logit via log(p) - log1p(-p) avoids the p / (1 - p) cancellation near 1;
+    the sigmoid only ever exponentiates a non-positive argument.
+    """
+    z = np.log(p) - np.log1p(-p) + gamma * ifs
+    e = np.exp(-np.abs(z))
+    return np.where(z >= 0, 1.0 / (1.0 + e), e / (1.0 + e))
+
+
+@lru_cache(maxsize=8)
+def _load_cfg(path: str, mtime: float) -> dict:
+    """
+    Parse an IFO config file (.yaml/.yml or .json)
+    
+    Cached on (absolute path, mtime) so engines built in a loop share one
+    parse; editing the file changes mtime and forces a reload. Callers must
+    not mutate the returned dict.
+    """
+    with open(path, 'r') as f:
+        if path.endswith(('.yaml', '.yml')):
+            import yaml  # only needed for YAML configs
+            loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+            return yaml.load(f, Loader=loader)
+        return json.load(f)
+
+
+def _kahan_add(total: float, err: float, value: float) -> Tuple[float, float]:
+    """
+    Compensated (Kahan) running-sum step: returns the new (total, err)
+    
+    err carries the low-order bits lost by the previous additions, so long
+    chains of += keep close to full float64 precision.
+    """
+    y = value - err
+    t = total + y
+    return t, (t - total) - y
+
+
+def _ring_tail(ring: np.ndarray, count: int) -> np.ndarray:
+    """Chronological copy of the filled part of a ring buffer written at count % size"""
+    if count < ring.size:
+        return ring[:count].copy()
+    return np.roll(ring, -(count % ring.size))
+
+
+@dataclass
+class IFOState:
+    """
+    Rolling per-ticker feature state for incremental RV / A/D slope updates
+    
+    Ring buffers hold the last `ad_mad_window` money-flow volumes and
+    cumulative A/D values, and the last `rv_long_window` volumes. Running
+    sums keep the A/D OLS slope and the RV moments O(1) per bar once the
+    buffers are full; everything is recomputed from the rings every
+    _STATE_REFRESH_BARS bars. The A/D sums use x centered on the slope
+    window and Kahan compensation (the *_err fields). Create with
+    IFOEngine.new_state().
+    """
+    mfv: np.ndarray
+    ad: np.ndarray
+    volume: np.ndarray
+    count: int = 0
+    ad_last: float = 0.0
+    ad_sy: float = 0.0
+    ad_sy_err: float = 0.0
+    ad_sxy: float = 0.0
+    ad_sxy_err: float = 0.0
+    vol_shift: float = 0.0
+    vol_sum: float = 0.0
+    vol_sumsq: float = 0.0
+    vol_sum_short: float = 0.0
+    since_refresh: int = 0
 
 
 class IFOEngine:
@@ -15,8 +238,8 @@ class IFOEngine:
     
     def __init__(self, config_path: str = 'config/ifo.json'):
         """Load configuration"""
-        with open(config_path, 'r') as f:
-            self.config = json.load(f)
+        path = os.path.abspath(config_path)
+        self.config = _load_cfg(path, os.path.getmtime(path))
         
         self.weights = self.config['weights']
         self.gamma = self.config['gamma']
@@ -30,17 +253,32 @@ class IFOEngine:
         Relative Volume z-score
         RV = (mean_vol_5d - mean_vol_100d) / std(vol_100d)
         """
-        if len(volumes) < 100:
+        if len(volumes) < _RV_MIN_BARS:
+            return np.nan
+        
+        # Slice before converting: only the trailing window (and at least the
+        # _RV_MIN_BARS bars calculate_rv_array checks for) is copied to float64
+        long_window = self.config['features']['rv_long_window']
+        tail = volumes.iloc[-max(long_window, _RV_MIN_BARS):]
+        return self.calculate_rv_array(tail.to_numpy(dtype=np.float64))
+    
+    def calculate_rv_array(self, volumes: np.ndarray) -> float:
+        """
+        Relative Volume z-score from a raw volume array
+        
+        Same result as calculate_rv without a Series; only the trailing
+        rv_long_window values are used.
+        """
+        if len(volumes) < _RV_MIN_BARS:
             return np.nan
         
         short_window = self.config['features']['rv_short_window']
         long_window = self.config['features']['rv_long_window']
         
-        mean_5d = volumes.tail(short_window).mean()
-        mean_100d = volumes.tail(long_window).mean()
-        std_100d = volumes.tail(long_window).std()
+        window = np.asarray(volumes[-long_window:], dtype=np.float64)
+        mean_5d, mean_100d, std_100d = _rv_stats(window, short_window)
         
-        if std_100d == 0 or pd.isna(std_100d):
+        if std_100d == 0 or np.isnan(std_100d):
             return 0.0
         
         rv = (mean_5d - mean_100d) / std_100d
@@ -62,38 +300,236 @@ class IFOEngine:
             return np.nan
         
         # Use last 120 days
-        window = ohlcv.tail(120).copy()
+        window = ohlcv.tail(120)
+        
+        return self.calculate_ad_slope_array(
+            window['High'].to_numpy(dtype=np.float64),
+            window['Low'].to_numpy(dtype=np.float64),
+            window['Close'].to_numpy(dtype=np.float64),
+            window['Volume'].to_numpy(dtype=np.float64)
+        )
+    
+    def calculate_ad_slope_array(
+        self,
+        high: np.ndarray,
+        low: np.ndarray,
+        close: np.ndarray,
+        volume: np.ndarray
+    ) -> float:
+        """
+        Accumulation/Distribution normalized slope from raw price arrays
         
-        # Money Flow Multiplier
-        numerator = (window['Close'] - window['Low']) - (window['High'] - window['Close'])
-        denominator = np.maximum(window['High'] - window['Low'], 1e-6)
-        mfm = numerator / denominator
+        Same result as calculate_ad_slope without building a DataFrame;
+        only the last 120 bars are used.
+        """
+        if len(close) < 120:
+            return np.nan
         
-        # Money Flow Volume
-        mfv = mfm * window['Volume']
+        features = self.config['features']
+        return _ad_slope_kernel(
+            np.asarray(high[-120:], dtype=np.float64),
+            np.asarray(low[-120:], dtype=np.float64),
+            np.asarray(close[-120:], dtype=np.float64),
+            np.asarray(volume[-120:], dtype=np.float64),
+            features['ad_lookback'],
+            features['ad_slope_clip']['min'],
+            features['ad_slope_clip']['max']
+        )
+    
+    def calculate_rv_batch(self, volumes: Sequence[pd.Series]) -> np.ndarray:
+        """
+        Relative Volume z-score for many tickers at once
+        
+        The trailing `rv_long_window` volumes of every history with at least
+        _RV_MIN_BARS bars are copied once into a matrix (NaN-padded on the
+        left for short histories) and reduced along rows; the rest are NaN
+        without being reduced. Same values as calculate_rv per ticker.
+        """
+        features = self.config['features']
+        short_window = features['rv_short_window']
+        long_window = features['rv_long_window']
+        
+        rv = np.full(len(volumes), np.nan)
+        enough = [i for i, series in enumerate(volumes) if len(series) >= _RV_MIN_BARS]
+        if not enough:
+            return rv
+        
+        V = np.full((len(enough), long_window), np.nan)
+        for row, i in enumerate(enough):
+            tail = volumes[i].iloc[-long_window:].to_numpy(dtype=np.float64)
+            V[row, -tail.size:] = tail
+        
+        if np.isnan(V).any():
+            mean_5d = np.nanmean(V[:, -short_window:], axis=1)
+            mean_100d = np.nanmean(V, axis=1)
+            std_100d = np.nanstd(V, axis=1, ddof=1)
+        else:
+            mean_5d = V[:, -short_window:].mean(axis=1)
+            mean_100d = V.mean(axis=1)
+            std_100d = V.std(axis=1, ddof=1)
         
-        # Accumulation/Distribution line (cumulative within window)
-        ad = mfv.cumsum().values
+        z = (mean_5d - mean_100d) / np.where(std_100d > 0, std_100d, 1.0)
+        rv[enough] = np.where((std_100d == 0) | np.isnan(std_100d), 0.0, z)
+        return rv
+    
+    def calculate_ad_slope_batch(self, ohlcvs: Sequence[pd.DataFrame]) -> np.ndarray:
+        """
+        Accumulation/Distribution normalized slope for many tickers at once
         
-        # OLS slope over last L=20 bars
+        The last 120 bars of every OHLCV frame are copied once into N×120
+        High/Low/Close/Volume matrices; MFM, cumulative AD, the OLS slope
+        and the MAD are then computed row-wise in single vector passes.
+        Tickers with fewer than 120 bars get NaN. Same values as
+        calculate_ad_slope per ticker.
+        """
+        W = 120
+        features = self.config['features']
+        L = features['ad_lookback']
+        
+        H, Lo, C, V = (np.full((len(ohlcvs), W), np.nan) for _ in range(4))
+        enough = np.array([len(df) >= W for df in ohlcvs], dtype=bool)
+        for i, df in enumerate(ohlcvs):
+            if enough[i]:
+                window = df.tail(W)
+                H[i] = window['High'].to_numpy(dtype=np.float64)
+                Lo[i] = window['Low'].to_numpy(dtype=np.float64)
+                C[i] = window['Close'].to_numpy(dtype=np.float64)
+                V[i] = window['Volume'].to_numpy(dtype=np.float64)
+        
+        mfm = ((C - Lo) - (H - C)) / np.maximum(H - Lo, 1e-6)
+        ad = np.cumsum(mfm * V, axis=1)
+        slope = ad[:, -L:] @ _ols_slope_weights(L)
+        
+        med = np.median(ad, axis=1, keepdims=True)
+        mad = np.median(np.abs(ad - med), axis=1) / _MAD_NORMAL_SCALE
+        valid = (mad != 0) & ~np.isnan(mad)
+        
+        clip = features['ad_slope_clip']
+        ad_slope = np.clip(slope / np.where(valid, mad, 1.0), clip['min'], clip['max'])
+        ad_slope = np.where(valid, ad_slope, 0.0)
+        return np.where(enough, ad_slope, np.nan)
+    
+    def new_state(self) -> IFOState:
+        """Empty IFOState sized from the feature config"""
+        features = self.config['features']
+        return IFOState(
+            mfv=np.zeros(features['ad_mad_window']),
+            ad=np.zeros(features['ad_mad_window']),
+            volume=np.zeros(features['rv_long_window'])
+        )
+    
+    def update(self, state: IFOState, bar: Mapping[str, float]) -> Tuple[float, float]:
+        """
+        Push one OHLCV bar into a ticker's state and return (RV, AD_slope)
+        
+        Equivalent to calculate_rv / calculate_ad_slope on the full history
+        up to and including `bar` (NaN until enough bars have been seen), but
+        O(1) per bar for the running sums once warm. The A/D MAD still takes
+        a median over the 120-bar ring.
+        """
+        features = self.config['features']
+        L = features['ad_lookback']
+        short = features['rv_short_window']
+        
+        high, low, close, volume = (float(bar[k]) for k in ('High', 'Low', 'Close', 'Volume'))
+        mfv = ((close - low) - (high - close)) / np.maximum(high - low, 1e-6) * volume
+        
+        W, Wv, t = state.ad.size, state.volume.size, state.count
+        
+        # Values leaving the slope / RV windows (read before overwrite)
+        y_old = state.ad[(t - L) % W]
+        v_old = state.volume[t % Wv]
+        v_old_short = state.volume[(t - short) % Wv]
+        
+        state.ad_last += mfv
+        state.mfv[t % W] = mfv
+        state.ad[t % W] = state.ad_last
+        state.volume[t % Wv] = volume
+        state.count += 1
+        state.since_refresh += 1
+        
+        running = (state.ad_last, state.ad_sy, state.ad_sxy, state.vol_sum, state.vol_sumsq, state.vol_sum_short)
+        if t < W or t < Wv or state.since_refresh >= _STATE_REFRESH_BARS or not np.isfinite(running).all():
+            self._refresh_state(state)
+        else:
+            # Slide centered x (-m..m) down one bar: every surviving y loses
+            # one x step, y_old leaves at -m and the new value enters at +m
+            m = (L - 1) / 2.0
+            state.ad_sxy, state.ad_sxy_err = _kahan_add(
+                state.ad_sxy, state.ad_sxy_err, m * (state.ad_last + y_old) - (state.ad_sy - y_old)
+            )
+            state.ad_sy, state.ad_sy_err = _kahan_add(state.ad_sy, state.ad_sy_err, state.ad_last - y_old)
+            d_new, d_old = volume - state.vol_shift, v_old - state.vol_shift
+            state.vol_sum += d_new - d_old
+            state.vol_sumsq += d_new * d_new - d_old * d_old
+            state.vol_sum_short += volume - v_old_short
+        
+        return self._state_rv(state), self._state_ad_slope(state)
+    
+    def _refresh_state(self, state: IFOState):
+        """Rebuild A/D values and running sums from the ring buffers"""
+        W, Wv, count = state.ad.size, state.volume.size, state.count
         L = self.config['features']['ad_lookback']
-        ad_recent = ad[-L:]
-        x = np.arange(L)
-        slope, _ = np.polyfit(x, ad_recent, 1)
+        short = self.config['features']['rv_short_window']
+        
+        # Rebase cumulative A/D to the window start (slope and MAD are shift-invariant)
+        n = min(count, W)
+        ad = np.cumsum(_ring_tail(state.mfv, count))
+        state.ad[np.arange(count - n, count) % W] = ad
+        state.ad_last = float(ad[-1]) if n else 0.0
+        y = ad[-L:]
+        state.ad_sy = float(y.sum())
+        state.ad_sxy = float((np.arange(y.size, dtype=np.float64) - (L - 1) / 2.0) @ y)
+        state.ad_sy_err = state.ad_sxy_err = 0.0
+        
+        # Volume moments about the window mean to limit cancellation
+        vols = _ring_tail(state.volume, count)[-Wv:]
+        state.vol_shift = float(vols.mean()) if vols.size and np.isfinite(vols).all() else 0.0
+        d = vols - state.vol_shift
+        state.vol_sum = float(d.sum())
+        state.vol_sumsq = float(d @ d)
+        state.vol_sum_short = float(vols[-short:].sum())
+        state.since_refresh = 0
+    
+    def _state_rv(self, state: IFOState) -> float:
+        """RV from IFOState running sums (same result as calculate_rv)"""
+        if state.count < _RV_MIN_BARS:
+            return np.nan
         
-        # Normalize by MAD of full 120-day AD
-        mad = stats.median_abs_deviation(ad, scale='normal')
-        if mad == 0 or np.isnan(mad):
-            normalized_slope = 0.0
+        short = self.config['features']['rv_short_window']
+        n = min(state.count, state.volume.size)
+        mean_100d = state.vol_shift + state.vol_sum / n
+        var_100d = (state.vol_sumsq - state.vol_sum * state.vol_sum / n) / (n - 1)
+        
+        if not np.isfinite(var_100d) or var_100d <= 1e-12 * mean_100d * mean_100d:
+            # NaN volumes or near-constant window: recompute exactly
+            mean_5d, mean_100d, std_100d = _rv_stats(_ring_tail(state.volume, state.count), short)
         else:
-            normalized_slope = slope / mad
+            mean_5d, std_100d = state.vol_sum_short / short, np.sqrt(var_100d)
+        
+        if std_100d == 0 or pd.isna(std_100d):
+            return 0.0
+        
+        return float((mean_5d - mean_100d) / std_100d)
+    
+    def _state_ad_slope(self, state: IFOState) -> float:
+        """AD_slope from IFOState (same result as calculate_ad_slope)"""
+        if state.count < 120:
+            return np.nan
+        
+        features = self.config['features']
+        L = features['ad_lookback']
+        # Centered x: slope = Σ(x - x̄)y / Σ(x - x̄)², no large-term cancellation
+        slope = state.ad_sxy / ((L - 1) * L * (L + 1) / 12.0)
         
-        # Clip to [-2, +2]
-        clip_min = self.config['features']['ad_slope_clip']['min']
-        clip_max = self.config['features']['ad_slope_clip']['max']
-        normalized_slope = np.clip(normalized_slope, clip_min, clip_max)
+        ad = state.ad
+        med = np.median(ad)
+        mad = np.median(np.abs(ad - med)) / _MAD_NORMAL_SCALE
+        if mad == 0 or np.isnan(mad):
+            return 0.0
         
-        return float(normalized_slope)
+        clip = features['ad_slope_clip']
+        return float(_clip(slope / mad, clip['min'], clip['max']))
     
     def calculate_ifs_raw(
         self,
@@ -115,39 +551,54 @@ class IFOEngine:
             'has_ZDTC': z_dtc is not None and not np.isnan(z_dtc)
         }
         
-        # Build active weights
-        active_weights = {}
-        if components['has_ZH']:
-            active_weights['Z_H'] = self.weights['Z_H']
-        if components['has_RV']:
-            active_weights['RV'] = self.weights['RV']
-        if components['has_ADslope']:
-            active_weights['AD_slope'] = self.weights['AD_slope']
-        if components['has_ZDTC']:
-            active_weights['Z_DTC'] = self.weights['Z_DTC']
-        
-        # Renormalize to sum = 1
-        total_weight = sum(active_weights.values())
-        if total_weight == 0:
+        # Scalar form of calculate_ifs_raw_batch
+        present = [
+            (value, self.weights[key])
+            for value, key, has in (
+                (z_h, 'Z_H', components['has_ZH']),
+                (rv, 'RV', components['has_RV']),
+                (ad_slope, 'AD_slope', components['has_ADslope']),
+                (z_dtc, 'Z_DTC', components['has_ZDTC'])
+            )
+            if has
+        ]
+        total = sum(weight for _, weight in present)
+        if total == 0:
             return 0.0, components
         
-        normalized_weights = {k: v / total_weight for k, v in active_weights.items()}
+        ifs_raw = sum(value * weight for value, weight in present) / total
+        return float(_clip(ifs_raw, -3.0, 3.0)), components
+    
+    def calculate_ifs_raw_batch(
+        self,
+        z_h: np.ndarray,
+        rv: np.ndarray,
+        ad_slope: np.ndarray,
+        z_dtc: np.ndarray,
+        dtype=np.float64
+    ) -> np.ndarray:
+        """
+        Calculate raw IFS for a whole universe in one vector pass
+        
+        Each argument is a 1-D array of equal length (one entry per ticker);
+        NaN marks a missing component. Weights are renormalized per row over
+        the components present, and the result is clipped to [-3, +3].
+        Rows with no weighted component score 0.0. Pass dtype=np.float32 to
+        halve memory traffic on large universes (scores are bounded, so
+        single precision is ample).
+        """
+        X = np.column_stack([z_h, rv, ad_slope, z_dtc]).astype(dtype)
+        W = np.array([self.weights[k] for k in ('Z_H', 'RV', 'AD_slope', 'Z_DTC')], dtype=dtype)
         
-        # Calculate weighted score
-        ifs_raw = 0.0
-        if components['has_ZH']:
-            ifs_raw += normalized_weights['Z_H'] * z_h
-        if components['has_RV']:
-            ifs_raw += normalized_weights['RV'] * rv
-        if components['has_ADslope']:
-            ifs_raw += normalized_weights['AD_slope'] * ad_slope
-        if components['has_ZDTC']:
-            ifs_raw += normalized_weights['Z_DTC'] * z_dtc
+        # Renormalized weighted score without branching on components:
+        # Σ w·x over present components / Σ w over present (two mat-vecs)
+        present = ~np.isnan(X)
+        total = present @ W
+        weighted = np.where(present, X, 0.0) @ W
+        ifs_raw = np.divide(weighted, total, out=np.zeros_like(weighted), where=total > 0)
         
         # Clip to [-3, +3]
-        ifs_raw = np.clip(ifs_raw, -3.0, 3.0)
-        
-        return float(ifs_raw), components
+        return np.clip(ifs_raw, -3.0, 3.0)
     
     def smooth_ifs(self, ifs_raw_series: pd.Series) -> pd.Series:
         """
@@ -156,8 +607,40 @@ class IFOEngine:
         Convert half-life to alpha: alpha = 1 - exp(ln(0.5) / half_life)
         """
         alpha = 1 - np.exp(np.log(0.5) / self.ema_hl)
-        ifs_smoothed = ifs_raw_series.ewm(alpha=alpha, adjust=False).mean()
-        return ifs_smoothed
+        
+        values = ifs_raw_series.to_numpy(dtype=np.float64)
+        if values.size == 0 or np.isnan(values).any():
+            # pandas carries the last value across gaps; keep its semantics
+            return ifs_raw_series.ewm(alpha=alpha, adjust=False).mean()
+        
+        ifs_smoothed = _ewm_recursive(values, alpha)
+        return pd.Series(ifs_smoothed, index=ifs_raw_series.index, name=ifs_raw_series.name)
+    
+    def smooth_ifs_batch(self, ifs_raw: np.ndarray) -> np.ndarray:
+        """
+        Smooth a universe of raw IFS histories with the same EMA
+        
+        ifs_raw is an N×T matrix (one row per ticker). NaN-free rows are
+        filtered together in one lfilter call; rows containing NaN go through
+        pandas to keep smooth_ifs' gap handling. Same values as smooth_ifs
+        per row.
+        
+        Returns:
+            N×T matrix of smoothed IFS
+        """
+        alpha = 1 - np.exp(np.log(0.5) / self.ema_hl)
+        
+        X = np.asarray(ifs_raw, dtype=np.float64)
+        if X.shape[1] == 0:
+            return X.copy()
+        
+        out = np.empty_like(X)
+        has_nan = np.isnan(X).any(axis=1)
+        if not has_nan.all():
+            out[~has_nan] = _ewm_recursive(X[~has_nan], alpha)
+        for i in np.flatnonzero(has_nan):
+            out[i] = pd.Series(X[i]).ewm(alpha=alpha, adjust=False).mean().to_numpy()
+        return out
     
     def rescale_ifs(self, ifs_smoothed_series: pd.Series) -> pd.Series:
         """
@@ -166,32 +649,50 @@ class IFOEngine:
         Uses rolling 252-day window, winsorize at 5th/95th percentiles,
         then linearly map to [-2, +2]
         """
-        if len(ifs_smoothed_series) < 252:
-            # Use all available data if < 252 days
-            window_data = ifs_smoothed_series
-        else:
-            window_data = ifs_smoothed_series.tail(252)
+        if len(ifs_smoothed_series) == 0:
+            return ifs_smoothed_series.astype(np.float64)
         
-        # Winsorize
-        lower_pct = self.config['winsor_pct']['lower']
-        upper_pct = self.config['winsor_pct']['upper']
+        values = ifs_smoothed_series.to_numpy(dtype=np.float64)
+        rescaled = self.rescale_ifs_batch(values[np.newaxis, :])[0]
         
-        lower_bound = window_data.quantile(lower_pct)
-        upper_bound = window_data.quantile(upper_pct)
+        return pd.Series(rescaled, index=ifs_smoothed_series.index, name=ifs_smoothed_series.name)
+    
+    def rescale_ifs_batch(self, smoothed: np.ndarray, dtype=np.float64) -> np.ndarray:
+        """
+        Winsorize and rescale a universe of IFS histories to [-2, +2]
         
-        winsorized = ifs_smoothed_series.clip(lower=lower_bound, upper=upper_bound)
+        smoothed is an N×T matrix (one row per ticker, NaN-padded if needed).
+        Bounds for every row come from one quantile call over the trailing
+        252 columns (or all of them if T < 252). Rows whose bounds coincide
+        map to 0.0; rows with no data in the window (NaN bounds) stay NaN.
+        dtype=np.float32 runs the whole pass in single precision.
         
-        # Rescale to [-2, +2]
-        if lower_bound == upper_bound:
-            return pd.Series(0.0, index=ifs_smoothed_series.index)
+        Returns:
+            N×T matrix of rescaled IFS
+        """
+        smoothed = np.asarray(smoothed, dtype=dtype)
+        window = smoothed[:, -252:]
+        
+        # Winsorize bounds for all rows at once
+        pcts = [self.config['winsor_pct']['lower'], self.config['winsor_pct']['upper']]
+        if np.isnan(window).any():
+            with warnings.catch_warnings():
+                # All-NaN rows get NaN bounds (handled below), not a warning
+                warnings.simplefilter('ignore', RuntimeWarning)
+                bounds = np.nanquantile(window, pcts, axis=1, keepdims=True)
+        else:
+            bounds = _row_quantiles(window, pcts)
+        lower_bound, upper_bound = bounds.astype(dtype, copy=False)
+        span = upper_bound - lower_bound
         
-        # Linear mapping
-        rescaled = -2.0 + 4.0 * (winsorized - lower_bound) / (upper_bound - lower_bound)
+        winsorized = np.clip(smoothed, lower_bound, upper_bound)
         
-        # Final clip to ensure [-2, +2]
-        rescaled = rescaled.clip(-2.0, 2.0)
+        # Linear mapping (degenerate rows → 0.0; NaN bounds propagate)
+        rescaled = -2.0 + 4.0 * (winsorized - lower_bound) / np.where(span > 0, span, 1.0)
+        rescaled = np.where(span == 0, 0.0, rescaled)
         
-        return rescaled
+        # Final clip to ensure [-2, +2]
+        return np.clip(rescaled, -2.0, 2.0)
     
     def adjust_posterior(self, p_bull_raw: float, ifs_smoothed: float) -> float:
         """
@@ -199,19 +700,13 @@ class IFOEngine:
         
         P_bull_adj = sigmoid( logit(P_bull_raw) + gamma * IFS_smoothed )
         """
-        # Clip p_bull_raw to avoid log(0) or log(1)
-        p_bull_raw = np.clip(p_bull_raw, 1e-6, 1 - 1e-6)
-        
-        # Logit transform
-        logit_p = np.log(p_bull_raw / (1 - p_bull_raw))
+        # Clip p_bull_raw: HMM posteriors saturate at exactly 0/1 and the
+        # IFS shift must still be able to move them
+        p_bull_raw = _clip(p_bull_raw, 1e-6, 1 - 1e-6)
         
-        # Add IFS shift
-        adjusted_logit = logit_p + self.gamma * ifs_smoothed
+        p_bull_adj = _logit_shift(np.array([p_bull_raw]), np.array([ifs_smoothed]), self.gamma)[0]
         
-        # Sigmoid back to probability
-        p_bull_adj = 1.0 / (1.0 + np.exp(-adjusted_logit))
-        
-        return float(np.clip(p_bull_adj, 0.0, 1.0))
+        return float(p_bull_adj)
     
     def scale_kelly(self, kelly_base: float, ifs_smoothed: float) -> float:
         """
@@ -220,8 +715,31 @@ class IFOEngine:
         kelly_adj = min(K_max, max(0, kelly_base * (1 + beta * IFS_smoothed)))
         """
         kelly_adj = kelly_base * (1 + self.beta * ifs_smoothed)
-        kelly_adj = np.clip(kelly_adj, 0.0, self.K_max)
-        return float(kelly_adj)
+        return float(_clip(kelly_adj, 0.0, self.K_max))
+    
+    def adjust_and_scale(
+        self,
+        p_bull_raw: np.ndarray,
+        kelly_base: np.ndarray,
+        ifs_smoothed: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Posterior adjustment and Kelly scaling from the same IFS in one pass
+        
+        Inputs broadcast (scalars or per-ticker arrays); the IFS array is
+        converted once and shared by both formulas. Same values as
+        adjust_posterior / scale_kelly elementwise.
+        
+        Returns:
+            (P_bull_adj, kelly_adj) as float64 arrays
+        """
+        ifs = np.asarray(ifs_smoothed, dtype=np.float64)
+        p = np.clip(np.asarray(p_bull_raw, dtype=np.float64), 1e-6, 1 - 1e-6)
+        
+        p_bull_adj = _logit_shift(p, ifs, self.gamma)
+        kelly_adj = np.clip(np.asarray(kelly_base, dtype=np.float64) * (1 + self.beta * ifs), 0.0, self.K_max)
+        
+        return p_bull_adj, kelly_adj
     
     def get_decision(self, ifs_smoothed: float, p_bull_adj: float) -> str:
         """
@@ -258,6 +776,46 @@ class IFOEngine:
         else:
             return 'Exit'
     
+    def get_decision_batch(self, ifs_smoothed: np.ndarray, p_bull_adj: np.ndarray) -> pd.Categorical:
+        """
+        Decision bands with tie-breakers for a whole universe
+        
+        Same rules and precedence as get_decision, via get_decision_codes.
+        
+        Returns:
+            Categorical of 'Exit' / 'Reduce' / 'Maintain' / 'Increase'
+        """
+        codes = self.get_decision_codes(ifs_smoothed, p_bull_adj)
+        return pd.Categorical.from_codes(codes, categories=_DECISIONS)
+    
+    def get_decision_codes(self, ifs_smoothed: np.ndarray, p_bull_adj: np.ndarray) -> np.ndarray:
+        """
+        Decision band codes for arrays of any (broadcastable) shape
+        
+        Same rules and precedence as get_decision, evaluated with one
+        np.select, so a whole ticker × bar panel is decided in one call.
+        Codes follow the category order of get_decision_batch:
+        0 = Exit, 1 = Reduce, 2 = Maintain, 3 = Increase.
+        
+        Returns:
+            int8 array with the broadcast shape of the inputs
+        """
+        ifs = np.asarray(ifs_smoothed, dtype=np.float64)
+        p = np.asarray(p_bull_adj, dtype=np.float64)
+        bands = self.config['decision_bands']
+        thresholds = self.config['bull_thresholds']
+        
+        conditions = [
+            p < thresholds['exit_force'],                       # force Exit
+            (p > thresholds['inc_allow']) & (ifs >= 0),         # allow Increase
+            ifs > bands['increase'],
+            ifs >= bands['maintain'],
+            ifs >= bands['exit'],
+        ]
+        # Codes index _DECISIONS: Exit, Reduce, Maintain, Increase
+        choices = np.array([0, 3, 3, 2, 1], dtype=np.int8)
+        return np.select(conditions, choices, default=np.int8(0))
+    
     def format_notes(
         self,
         components: Dict[str, bool],
@@ -2,11 +2,38 @@
 Universe Management System - CSV-based ticker universe with filtering and prioritization
 """
 
+import numpy as np
 import pandas as pd
 import json
 import os
 from typing import List, Dict, Tuple, Optional
 
+try:
+    import pyarrow  # noqa: F401
+    _CSV_ENGINE = 'pyarrow'
+except ImportError:  # pyarrow is optional; the C parser reads the same schema
+    _CSV_ENGINE = 'c'
+
+# Explicit CSV schema: compact dtypes, no inference pass
+_CSV_DTYPES = {
+    'ticker': str,
+    'name': str,
+    'exchange': str,
+    'sector': str,
+    'priority': pd.CategoricalDtype(['A', 'B', 'C'], ordered=True),
+    'source': str,
+    'notes': str,
+    'market_cap_musd': 'float64',
+    'price': 'float64',
+    'avg_vol_30d': 'float64',
+    'is_adr': str,
+    'is_etf': str,
+}
+
+# Flag columns are hand-edited; read as text and map spellings explicitly
+_FLAG_COLUMNS = ('is_adr', 'is_etf')
+_TRUE_FLAGS = frozenset(['true', '1', 'yes', 'y'])
+
 
 class UniverseLoader:
     """Load and filter ticker universe from CSV"""
@@ -14,6 +41,7 @@ class UniverseLoader:
     def __init__(self, config_path: str = 'config/universe_config.json'):
         self.config_path = config_path
         self.config = self._load_config()
+        self._build_lookups()
         self.csv_path = 'data/universe.csv'
         self.exclusions = []
     
@@ -52,6 +80,13 @@ class UniverseLoader:
         with open(self.config_path, 'r') as f:
             return json.load(f)
     
+    def _build_lookups(self):
+        """Precompute config-derived lookups used on every load"""
+        self._etf_blocklist_set = frozenset(
+            etf.upper() for etf in self.config.get('etf_blocklist', [])
+        )
+        self._priority_map = {'A': 0, 'B': 1, 'C': 2}
+    
     def load(self, use_priority_first: bool = None) -> Tuple[List[str], Dict]:
         """
         Load, filter, and sort ticker universe
@@ -75,16 +110,11 @@ class UniverseLoader:
             }
         
         try:
-            # Load CSV with explicit dtype for string columns
-            df = pd.read_csv(self.csv_path, dtype={
-                'ticker': str,
-                'name': str,
-                'exchange': str,
-                'sector': str,
-                'priority': str,
-                'source': str,
-                'notes': str
-            })
+            # Load CSV with an explicit schema
+            df = pd.read_csv(self.csv_path, engine=_CSV_ENGINE, dtype=_CSV_DTYPES)
+            for col in _FLAG_COLUMNS:
+                if col in df.columns:
+                    df[col] = df[col].str.strip().str.lower().isin(_TRUE_FLAGS)
             
             # Validate required columns
             required_cols = ['ticker']
@@ -156,168 +186,117 @@ class UniverseLoader:
             }
     
     def _apply_filters(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Apply all configured filters"""
-        filters = self.config['filters']
+        """
+        Apply all configured filters
         
-        # Start with all tickers
-        result = df.copy()
-        initial_count = len(result)
+        Every filter is evaluated as a boolean mask over the full frame; each
+        row is tagged with the first filter it fails (in the order below) and
+        the frame is sliced once. Exclusions are recorded grouped by filter.
+        """
+        filters = self.config['filters']
+        tickers = df['ticker']
+        checks = []  # (mask, reason) in priority order
         
         # Filter: blank tickers
-        blank_mask = result['ticker'].isna() | (result['ticker'] == '')
-        if blank_mask.any():
-            excluded = result[blank_mask]['ticker'].tolist()
-            self.exclusions.extend([
-                {'ticker': str(t), 'reason': 'Blank ticker'}
-                for t in excluded if pd.notna(t)
-            ])
-            result = result[~blank_mask]
+        checks.append((tickers.isna() | (tickers == ''), 'Blank ticker'))
         
         # Filter: ADRs
-        if filters.get('exclude_adr', True) and 'is_adr' in result.columns:
-            adr_mask = result['is_adr'] == True
-            if adr_mask.any():
-                excluded = result[adr_mask]['ticker'].tolist()
-                self.exclusions.extend([
-                    {'ticker': t, 'reason': 'ADR excluded'}
-                    for t in excluded
-                ])
-                result = result[~adr_mask]
+        if filters.get('exclude_adr', True) and 'is_adr' in df.columns:
+            checks.append((df['is_adr'] == True, 'ADR excluded'))
         
         # Filter: ETFs
         if filters.get('exclude_etf', True):
-            etf_blocklist = [etf.upper() for etf in self.config.get('etf_blocklist', [])]
             
             # Check is_etf column
-            if 'is_etf' in result.columns:
-                etf_mask = result['is_etf'] == True
-                if etf_mask.any():
-                    excluded = result[etf_mask]['ticker'].tolist()
-                    self.exclusions.extend([
-                        {'ticker': t, 'reason': 'ETF (column)'}
-                        for t in excluded
-                    ])
-                    result = result[~etf_mask]
+            if 'is_etf' in df.columns:
+                checks.append((df['is_etf'] == True, 'ETF (column)'))
             
             # Check blocklist (ensure ticker is string type)
-            result['ticker'] = result['ticker'].astype(str)
-            blocklist_mask = result['ticker'].str.upper().isin(etf_blocklist)
-            if blocklist_mask.any():
-                excluded = result[blocklist_mask]['ticker'].tolist()
-                self.exclusions.extend([
-                    {'ticker': t, 'reason': 'ETF (blocklist)'}
-                    for t in excluded
-                ])
-                result = result[~blocklist_mask]
+            blocklist_mask = tickers.astype(str).str.upper().isin(self._etf_blocklist_set)
+            checks.append((blocklist_mask, 'ETF (blocklist)'))
         
         # Filter: Min price
-        if 'price' in result.columns and filters.get('min_price'):
+        if 'price' in df.columns and filters.get('min_price'):
             min_price = filters['min_price']
-            price_mask = (result['price'].notna()) & (result['price'] < min_price)
-            if price_mask.any():
-                excluded = result[price_mask]['ticker'].tolist()
-                self.exclusions.extend([
-                    {'ticker': t, 'reason': f'Price < ${min_price}'}
-                    for t in excluded
-                ])
-                result = result[~price_mask]
+            price_mask = (df['price'].notna()) & (df['price'] < min_price)
+            checks.append((price_mask, f'Price < ${min_price}'))
         
         # Filter: Min volume
-        if 'avg_vol_30d' in result.columns and filters.get('min_avg_vol_30d'):
+        if 'avg_vol_30d' in df.columns and filters.get('min_avg_vol_30d'):
             min_vol = filters['min_avg_vol_30d']
-            vol_mask = (result['avg_vol_30d'].notna()) & (result['avg_vol_30d'] < min_vol)
-            if vol_mask.any():
-                excluded = result[vol_mask]['ticker'].tolist()
-                self.exclusions.extend([
-                    {'ticker': t, 'reason': f'Volume < {min_vol:,}'}
-                    for t in excluded
-                ])
-                result = result[~vol_mask]
+            vol_mask = (df['avg_vol_30d'].notna()) & (df['avg_vol_30d'] < min_vol)
+            checks.append((vol_mask, f'Volume < {min_vol:,}'))
         
         # Filter: Market cap range
-        if 'market_cap_musd' in result.columns:
+        if 'market_cap_musd' in df.columns:
+            mcap = df['market_cap_musd']
             if filters.get('market_cap_min_musd'):
                 min_mcap = filters['market_cap_min_musd']
-                mcap_min_mask = (result['market_cap_musd'].notna()) & (result['market_cap_musd'] < min_mcap)
-                if mcap_min_mask.any():
-                    excluded = result[mcap_min_mask]['ticker'].tolist()
-                    self.exclusions.extend([
-                        {'ticker': t, 'reason': f'MCap < ${min_mcap}M'}
-                        for t in excluded
-                    ])
-                    result = result[~mcap_min_mask]
+                checks.append(((mcap.notna()) & (mcap < min_mcap), f'MCap < ${min_mcap}M'))
             
             if filters.get('market_cap_max_musd'):
                 max_mcap = filters['market_cap_max_musd']
-                mcap_max_mask = (result['market_cap_musd'].notna()) & (result['market_cap_musd'] > max_mcap)
-                if mcap_max_mask.any():
-                    excluded = result[mcap_max_mask]['ticker'].tolist()
-                    self.exclusions.extend([
-                        {'ticker': t, 'reason': f'MCap > ${max_mcap}M'}
-                        for t in excluded
-                    ])
-                    result = result[~mcap_max_mask]
+                checks.append(((mcap.notna()) & (mcap > max_mcap), f'MCap > ${max_mcap}M'))
         
         # Filter: Exchanges
-        if 'exchange' in result.columns and filters.get('exchanges_allow'):
+        if 'exchange' in df.columns and filters.get('exchanges_allow'):
             allowed_exchanges = [ex.upper() for ex in filters['exchanges_allow']]
             # Ensure exchange is string type and handle empty/nan values
-            result['exchange'] = result['exchange'].fillna('').astype(str)
-            exchange_mask = (result['exchange'] != '') & (~result['exchange'].str.upper().isin(allowed_exchanges))
-            if exchange_mask.any():
-                excluded = result[exchange_mask]['ticker'].tolist()
-                self.exclusions.extend([
-                    {'ticker': t, 'reason': 'Exchange not allowed'}
-                    for t in excluded
-                ])
-                result = result[~exchange_mask]
+            exchange = df['exchange'].fillna('').astype(str)
+            exchange_mask = (exchange != '') & (~exchange.str.upper().isin(allowed_exchanges))
+            checks.append((exchange_mask, 'Exchange not allowed'))
+        
+        # First failing filter per row (0 = keep)
+        fail_code = np.select(
+            [mask.to_numpy(dtype=bool, na_value=False) for mask, _ in checks],
+            np.arange(1, len(checks) + 1),
+            default=0
+        )
+        
+        # Record exclusions grouped by filter, in frame order within each group
+        excluded = np.flatnonzero(fail_code)
+        excluded = excluded[np.argsort(fail_code[excluded], kind='stable')]
+        ticker_values = tickers.to_numpy()
+        for i in excluded:
+            t = ticker_values[i]
+            if pd.isna(t):
+                continue
+            self.exclusions.append({'ticker': str(t), 'reason': checks[fail_code[i] - 1][1]})
         
-        return result
+        return df[fail_code == 0]
     
     def _sort_tickers(self, df: pd.DataFrame, use_priority_first: bool) -> pd.DataFrame:
         """
         Sort tickers by priority, volume, and market cap
         
         Priority first (Option 2): Fill with all A, then B, then C
+        
+        One stable np.lexsort over column arrays; volume and market cap sort
+        descending with missing values last.
         """
-        if not use_priority_first or 'priority' not in df.columns:
-            # No priority sorting - just sort by volume and mcap
-            sort_keys = []
-            if 'avg_vol_30d' in df.columns:
-                sort_keys.append(('avg_vol_30d', False))  # Descending
-            if 'market_cap_musd' in df.columns:
-                sort_keys.append(('market_cap_musd', False))  # Descending
-            
-            if sort_keys:
-                result = df.sort_values(
-                    by=[k[0] for k in sort_keys],
-                    ascending=[k[1] for k in sort_keys],
-                    na_position='last'
-                )
-            else:
-                result = df
-        else:
+        # np.lexsort takes the primary key last
+        keys = []
+        if 'market_cap_musd' in df.columns:
+            keys.append(-df['market_cap_musd'].to_numpy(dtype=np.float64, na_value=-np.inf))
+        if 'avg_vol_30d' in df.columns:
+            keys.append(-df['avg_vol_30d'].to_numpy(dtype=np.float64, na_value=-np.inf))
+        
+        if use_priority_first and 'priority' in df.columns:
             # Priority first: A → B → C
-            # Convert priority to sortable (A=0, B=1, C=2, other=3)
-            priority_map = {'A': 0, 'B': 1, 'C': 2}
-            df['_priority_sort'] = df['priority'].map(priority_map).fillna(3)
-            
-            # Sort by priority, then volume, then mcap
-            sort_keys = [('_priority_sort', True)]  # Ascending (A first)
-            if 'avg_vol_30d' in df.columns:
-                sort_keys.append(('avg_vol_30d', False))  # Descending
-            if 'market_cap_musd' in df.columns:
-                sort_keys.append(('market_cap_musd', False))  # Descending
-            
-            result = df.sort_values(
-                by=[k[0] for k in sort_keys],
-                ascending=[k[1] for k in sort_keys],
-                na_position='last'
-            )
-            
-            result = result.drop(columns=['_priority_sort'])
+            priority = df['priority']
+            if isinstance(priority.dtype, pd.CategoricalDtype) and priority.cat.ordered:
+                # Ordered categorical from load(): codes 0-2, other/blank -1
+                codes = priority.cat.codes.to_numpy()
+                codes = np.where(codes < 0, 3, codes).astype(np.int8)
+            else:
+                # Convert priority to sortable (A=0, B=1, C=2, other=3)
+                codes = priority.map(self._priority_map).fillna(3).to_numpy().astype(np.int8)
+            keys.append(codes)
+        
+        if not keys:
+            return df
         
-        return result
+        return df.iloc[np.lexsort(keys)]
     
     def _count_by_priority(self, df: pd.DataFrame) -> Dict[str, int]:
         """Count tickers by priority level"""
@@ -334,3 +313,4 @@ class UniverseLoader:
     def reload_config(self):
         """Reload configuration from file"""
         self.config = self._load_config()
+        self._build_lookups()
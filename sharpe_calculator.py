@@ -10,9 +10,23 @@ from datetime import datetime, timedelta
 import warnings
 warnings.filterwarnings('ignore')
 
+
 class SharpeCalculator:
     """Professional Sharpe Ratio Calculator"""
     
+    # Rating buckets: below 0, [0, 0.5), [0.5, 1), [1, 1.5), [1.5, 2), 2 and above
+    _THRESH = np.array([0.0, 0.5, 1.0, 1.5, 2.0])
+    _LABELS = ('Very Poor', 'Poor', 'Acceptable', 'Good', 'Very Good', 'Excellent')
+    _COLORS = ('#dc3545', '#dc3545', '#ffc107', '#ffc107', '#28a745', '#28a745')
+    _BENCHMARKS = (
+        "Poor performance - significantly underperforms benchmarks",
+        "Poor performance - significantly underperforms benchmarks",
+        "Moderate performance - below average market returns",
+        "Good performance - competitive with major indices",
+        "Strong performance - beats most market indices",
+        "Outstanding performance - significantly outperforms most benchmarks",
+    )
+    
     def __init__(self):
         # Default risk-free rate (10-year Treasury approximation)
         self.risk_free_rate = 0.045
@@ -23,27 +37,41 @@ class SharpeCalculator:
         if risk_free_rate is None:
             risk_free_rate = self.risk_free_rate
         
-        # Download data
+        # Download all symbols in one batched request
+        symbols = list(symbols)
+        try:
+            raw = yf.download(symbols, start=start_date, end=end_date, progress=False,
+                              group_by='ticker', threads=True)
+        except Exception as e:
+            raise ValueError(f"Error downloading {', '.join(symbols)}: {str(e)}")
+        
+        if raw is None or raw.empty:
+            raise ValueError(f"No data available for {', '.join(symbols)}")
+        
         data = {}
         for symbol in symbols:
-            try:
-                stock_data = yf.download(symbol, start=start_date, end=end_date, progress=False)
-                if stock_data is None or stock_data.empty:
+            # group_by='ticker' gives (ticker, field) columns; yfinance
+            # upper-cases the tickers, so 'aapl' comes back as 'AAPL'
+            if isinstance(raw.columns, pd.MultiIndex):
+                level0 = raw.columns.get_level_values(0)
+                key = symbol if symbol in level0 else symbol.upper()
+                if key not in level0:
                     raise ValueError(f"No data available for {symbol}")
-                
-                # Handle MultiIndex columns from yfinance
-                if isinstance(stock_data.columns, pd.MultiIndex):
-                    stock_data.columns = stock_data.columns.droplevel(1)
-                
-                # Try Adj Close first, fallback to Close if not available
-                if 'Adj Close' in stock_data.columns:
-                    data[symbol] = stock_data['Adj Close'].squeeze()
-                elif 'Close' in stock_data.columns:
-                    data[symbol] = stock_data['Close'].squeeze()
-                else:
-                    raise ValueError(f"No price data found for {symbol}")
-            except Exception as e:
-                raise ValueError(f"Error downloading {symbol}: {str(e)}")
+                stock_data = raw[key]
+            else:
+                stock_data = raw
+            
+            # Try Adj Close first, fallback to Close if not available
+            if 'Adj Close' in stock_data.columns:
+                prices = stock_data['Adj Close']
+            elif 'Close' in stock_data.columns:
+                prices = stock_data['Close']
+            else:
+                raise ValueError(f"No price data found for {symbol}")
+            
+            if prices.isna().all():
+                raise ValueError(f"No data available for {symbol}")
+            data[symbol] = prices
         
         # Create portfolio dataframe
         portfolio_df = pd.DataFrame(data)
@@ -55,19 +83,23 @@ class SharpeCalculator:
         # Calculate daily returns
         returns = portfolio_df.pct_change().dropna()
         
-        # Calculate portfolio returns
-        portfolio_returns = (returns * weights).sum(axis=1)
+        # Calculate portfolio returns (single matrix-vector product)
+        R = returns.to_numpy(dtype=np.float64)
+        w = np.asarray(weights, dtype=np.float64)
+        portfolio_values = R @ w
+        portfolio_returns = pd.Series(portfolio_values, index=returns.index)
         
         # Calculate metrics
-        annual_return = portfolio_returns.mean() * 252
-        annual_volatility = portfolio_returns.std() * np.sqrt(252)
+        annual_return = portfolio_values.mean() * 252
+        annual_volatility = portfolio_values.std(ddof=1) * np.sqrt(252)
         
         # Sharpe ratio
         sharpe_ratio = (annual_return - risk_free_rate) / annual_volatility if annual_volatility > 0 else 0
         
         # Additional metrics
-        cumulative_returns = (1 + portfolio_returns).cumprod()
-        max_drawdown = self.calculate_max_drawdown(cumulative_returns)
+        cumulative_values = np.cumprod(1.0 + portfolio_values)
+        max_drawdown = self.calculate_max_drawdown(cumulative_values)
+        cumulative_returns = pd.Series(cumulative_values, index=returns.index)
         win_rate = (portfolio_returns > 0).mean()
         total_return = cumulative_returns.iloc[-1] - 1
         
@@ -100,34 +132,27 @@ class SharpeCalculator:
     
     def calculate_max_drawdown(self, cumulative_returns):
         """Calculate maximum drawdown"""
-        peak = cumulative_returns.expanding().max()
-        drawdown = (cumulative_returns - peak) / peak
-        return drawdown.min()
+        values = np.asarray(cumulative_returns, dtype=np.float64)
+        peak = np.maximum.accumulate(values)
+        return ((values - peak) / peak).min()
     
     def get_sharpe_rating(self, sharpe_ratio):
         """Get Sharpe ratio rating and color"""
-        if sharpe_ratio >= 2.0:
-            return "Excellent", "#28a745"
-        elif sharpe_ratio >= 1.5:
-            return "Very Good", "#28a745"
-        elif sharpe_ratio >= 1.0:
-            return "Good", "#ffc107"
-        elif sharpe_ratio >= 0.5:
-            return "Acceptable", "#ffc107"
-        elif sharpe_ratio >= 0.0:
-            return "Poor", "#dc3545"
-        else:
-            return "Very Poor", "#dc3545"
+        i = self._rating_index(sharpe_ratio)
+        return self._LABELS[i], self._COLORS[i]
+    
+    def get_sharpe_rating_batch(self, sharpe_ratios):
+        """Get Sharpe ratio ratings and colors for an array of ratios"""
+        i = self._rating_index(sharpe_ratios)
+        return np.asarray(self._LABELS)[i], np.asarray(self._COLORS)[i]
     
     def get_benchmark_comparison(self, sharpe_ratio):
         """Get benchmark comparison text"""
-        if sharpe_ratio >= 2.0:
-            return "Outstanding performance - significantly outperforms most benchmarks"
-        elif sharpe_ratio >= 1.5:
-            return "Strong performance - beats most market indices"
-        elif sharpe_ratio >= 1.0:
-            return "Good performance - competitive with major indices"
-        elif sharpe_ratio >= 0.5:
-            return "Moderate performance - below average market returns"
-        else:
-            return "Poor performance - significantly underperforms benchmarks"
+        return self._BENCHMARKS[self._rating_index(sharpe_ratio)]
+    
+    def _rating_index(self, sharpe_ratio):
+        """Rating bucket for each ratio (NaN falls in the lowest bucket)"""
+        values = np.asarray(sharpe_ratio, dtype=np.float64)
+        i = np.searchsorted(self._THRESH, values, side='right')
+        i = np.where(np.isnan(values), 0, i)
+        return int(i) if i.ndim == 0 else i
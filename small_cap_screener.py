@@ -7,15 +7,117 @@ import pandas as pd
 import numpy as np
 import yfinance as yf
 import streamlit as st
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed, wait
+from functools import lru_cache, wraps
+import os
+import queue
+import time
 from datetime import datetime, timedelta
-from typing import Optional, List
+from typing import Optional, List, Sequence, Tuple
 import warnings
+from utils import disk_cached
 warnings.filterwarnings('ignore')
 
+
+# Background screens (shared by all sessions in this Streamlit process)
+_SCREEN_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix='screen')
+
+# Per-symbol Yahoo requests from every running screen share this pool, so
+# concurrent sessions queue for it instead of each adding 32 threads
+# (network-bound; workers mostly sit in socket waits, so this can exceed
+# the core count)
+MAX_FETCH_WORKERS = 32
+_FETCH_EXECUTOR = ThreadPoolExecutor(max_workers=MAX_FETCH_WORKERS, thread_name_prefix='yf-fetch')
+
+def drain_screen_events(events: queue.Queue) -> List[tuple]:
+    """Pop every event currently queued by a submit_screen job"""
+    drained = []
+    while True:
+        try:
+            drained.append(events.get_nowait())
+        except queue.Empty:
+            return drained
+
+
+@lru_cache(maxsize=2048)
+def _cached_ticker(symbol: str) -> yf.Ticker:
+    """Process-wide yf.Ticker per symbol"""
+    return yf.Ticker(symbol)
+
+def _ttl_lru_cache(seconds: int, maxsize: int = 2048):
+    """
+    lru_cache whose entries expire every `seconds`
+    
+    Used instead of st.cache_data for fetchers called from worker threads,
+    which have no ScriptRunContext; the time bucket is part of the key, so
+    stale buckets simply age out of the LRU.
+    """
+    def decorator(fn):
+        cached = lru_cache(maxsize=maxsize)(lambda symbol, _bucket: fn(symbol))
+        
+        @wraps(fn)
+        def wrapper(symbol):
+            return cached(symbol, int(time.monotonic() // seconds))
+        return wrapper
+    return decorator
+
+@_ttl_lru_cache(900)
+def _cached_info(symbol: str) -> dict:
+    """Ticker info (15-minute memory cache over the daily disk cache)"""
+    return disk_cached('info', symbol, lambda: dict(_cached_ticker(symbol).info))
+
+@_ttl_lru_cache(900)
+def _cached_financials(symbol: str) -> pd.DataFrame:
+    """Income statement (15-minute memory cache over the daily disk cache)"""
+    return disk_cached('financials', symbol, lambda: _cached_ticker(symbol).financials)
+
+
+def _cagr(values: np.ndarray, years: int):
+    """CAGR from the value `years` periods back to the last one (chronological array)"""
+    start_value = values[-years]
+    if start_value <= 0:
+        return 0
+    return (values[-1] / start_value) ** (1 / years) - 1
+
+def _consistent_growth(values: np.ndarray, years: int) -> bool:
+    """At least 70% of the last `years` periods grew (chronological array)"""
+    growth_years = np.count_nonzero(np.diff(values[-years:]) > 0)
+    return bool(growth_years >= (years - 1) * 0.7)
+
+
+def _numeric_column(df: pd.DataFrame, name: str) -> pd.Series:
+    """Column as floats (missing column or non-numeric values → NaN)"""
+    if name not in df.columns:
+        return pd.Series(np.nan, index=df.index)
+    return pd.to_numeric(df[name], errors='coerce').astype(np.float64)
+
+# Files the default universe is built from (see shared.universe_loader)
+_UNIVERSE_FILES = ('data/universe.csv', 'config/universe_config.json')
+
+def _universe_mtimes() -> tuple:
+    """Modification times of the universe files (None if missing)"""
+    return tuple(os.path.getmtime(p) if os.path.exists(p) else None for p in _UNIVERSE_FILES)
+
+@st.cache_resource
+def _load_universe(use_priority_first: bool, mtimes: tuple):
+    """
+    Load and filter the default universe once per file version
+    
+    mtimes is only part of the cache key: editing the CSV or config
+    yields a new key, so reruns reuse the same ticker tuple until then.
+    The tuple is shared (not copied) across reruns and sessions, which is
+    why it is immutable.
+    """
+    from shared.universe_loader import UniverseLoader
+    loader = UniverseLoader()
+    universe, stats = loader.load(use_priority_first=use_priority_first)
+    return tuple(universe), stats
+
+
 class SmallCapScreener:
     """Small Cap Stock Screener with fundamental analysis"""
     
-    def __init__(self, universe: Optional[List[str]] = None, use_priority_first: bool = False):
+    def __init__(self, universe: Optional[Sequence[str]] = None, use_priority_first: bool = False):
         # Screening criteria defaults
         self.default_criteria = {
             'market_cap_min': 300_000_000,  # $300M minimum
@@ -31,30 +133,43 @@ class SmallCapScreener:
         
         # Use provided universe or load from universe management system
         if universe is None:
-            from shared.universe_loader import UniverseLoader
-            loader = UniverseLoader()
-            universe, stats = loader.load(use_priority_first=use_priority_first)
+            universe, stats = _load_universe(use_priority_first, _universe_mtimes())
             
             if stats.get('error'):
                 st.warning(f"Universe loader: {stats['error']}")
-                universe = []
+                universe = ()
         
-        # Set the small cap universe
-        self.small_cap_universe = universe if universe else []
+        # Set the small cap universe (immutable, so it can be shared as-is)
+        self.small_cap_universe = tuple(universe) if universe else ()
         
         # Also keep full universe for compatibility
-        self.full_universe = self.small_cap_universe.copy()
+        self.full_universe = self.small_cap_universe
+    
+    def get_stock_fundamentals(self, symbol, fetch_statements: bool = False):
+        """
+        Get fundamental data for a single stock
+        
+        The income statement (an extra request) is only fetched when
+        fetch_statements is True, e.g. for a detail view; scoring needs
+        info fields only, and growth metrics stay at their defaults.
+        """
+        fundamentals, error = self._fetch_fundamentals(symbol, fetch_statements)
+        if error:
+            st.warning(f"Could not fetch data for {symbol}: {error}")
+        return fundamentals
     
-    def get_stock_fundamentals(self, symbol):
-        """Get fundamental data for a single stock"""
+    def _fetch_fundamentals(self, symbol, fetch_statements: bool = False) -> Tuple[Optional[dict], Optional[str]]:
+        """
+        Fetch fundamentals without touching Streamlit (safe in worker threads)
+        
+        Returns:
+            (fundamentals, None) on success, (None, error_message) on failure
+        """
         try:
-            ticker = yf.Ticker(symbol)
-            info = ticker.info
+            info = _cached_info(symbol)
             
-            # Get financial statements
-            financials = ticker.financials
-            balance_sheet = ticker.balance_sheet
-            cash_flow = ticker.cash_flow
+            # Get financial statements (only when asked for)
+            financials = _cached_financials(symbol) if fetch_statements else pd.DataFrame()
             
             # Calculate key metrics
             fundamentals = {
@@ -85,13 +200,11 @@ class SmallCapScreener:
             
             # Calculate additional metrics
             fundamentals.update(self.calculate_growth_metrics(financials))
-            fundamentals.update(self.calculate_quality_metrics(info, balance_sheet, cash_flow))
             
-            return fundamentals
+            return fundamentals, None
             
         except Exception as e:
-            st.warning(f"Could not fetch data for {symbol}: {str(e)}")
-            return None
+            return None, str(e)
     
     def calculate_bid_ask_spread(self, info):
         """Calculate bid-ask spread percentage"""
@@ -118,12 +231,13 @@ class SmallCapScreener:
         try:
             # Get revenue data
             if 'Total Revenue' in financials.index:
-                revenues = financials.loc['Total Revenue'].dropna()
+                # Sort once, then work on the raw array
+                revenues = financials.loc['Total Revenue'].dropna().sort_index().to_numpy(dtype=np.float64)
                 if len(revenues) >= 3:
-                    metrics['revenue_3yr_cagr'] = self.calculate_cagr(revenues, 3)
-                    metrics['consistent_revenue_growth'] = self.check_consistent_growth(revenues, 3)
+                    metrics['revenue_3yr_cagr'] = _cagr(revenues, 3)
+                    metrics['consistent_revenue_growth'] = _consistent_growth(revenues, 3)
                 if len(revenues) >= 5:
-                    metrics['revenue_5yr_cagr'] = self.calculate_cagr(revenues, 5)
+                    metrics['revenue_5yr_cagr'] = _cagr(revenues, 5)
             
             return metrics
             
@@ -135,101 +249,139 @@ class SmallCapScreener:
         try:
             if len(values) < years:
                 return 0
-            
-            values_sorted = values.sort_index()
-            start_value = values_sorted.iloc[-years]
-            end_value = values_sorted.iloc[-1]
-            
-            if start_value <= 0:
-                return 0
-                
-            cagr = (end_value / start_value) ** (1/years) - 1
-            return cagr
+            return _cagr(values.sort_index().to_numpy(dtype=np.float64), years)
         except:
             return 0
     
     def check_consistent_growth(self, values, years):
         """Check if growth has been consistent"""
-        try:
-            if len(values) < years:
-                return False
-            
-            values_sorted = values.sort_index()
-            recent_values = values_sorted.iloc[-years:]
-            
-            # Check if at least 70% of years showed growth
-            growth_years = 0
-            for i in range(1, len(recent_values)):
-                if recent_values.iloc[i] > recent_values.iloc[i-1]:
-                    growth_years += 1
-            
-            return growth_years >= (years - 1) * 0.7
-        except:
+        if len(values) < years:
             return False
+        return _consistent_growth(values.sort_index().to_numpy(dtype=np.float64), years)
     
-    def calculate_quality_metrics(self, info, balance_sheet, cash_flow):
-        """Calculate additional quality metrics"""
-        metrics = {
-            'debt_to_equity_ratio': 0,
-            'current_ratio': 0,
-            'cash_ratio': 0,
-            'asset_turnover': 0,
-            'inventory_turnover': 0,
-            'working_capital': 0,
-            'tangible_book_value': 0
-        }
+    def screen_stocks(self, criteria) -> pd.DataFrame:
+        """
+        Screen stocks based on criteria
         
-        try:
-            # Debt to equity
-            total_debt = info.get('totalDebt', 0)
-            total_equity = info.get('totalStockholderEquity', 0)
-            if total_equity > 0:
-                metrics['debt_to_equity_ratio'] = total_debt / total_equity
-            
-            # Current ratio
-            metrics['current_ratio'] = info.get('currentRatio', 0)
-            
-            return metrics
-        except:
-            return metrics
-    
-    def screen_stocks(self, criteria):
-        """Screen stocks based on criteria"""
-        results = []
+        Blocking wrapper around submit_screen that reports progress with
+        st.progress until the job finishes.
         
+        Returns:
+            DataFrame with one row per passing stock (fundamentals columns
+            plus 'screening_score'), best score first
+        """
         progress_bar = st.progress(0)
         status_text = st.empty()
         
-        for i, symbol in enumerate(self.small_cap_universe):
-            status_text.text(f"Analyzing {symbol}... ({i+1}/{len(self.small_cap_universe)})")
-            progress_bar.progress((i + 1) / len(self.small_cap_universe))
-            
-            fundamentals = self.get_stock_fundamentals(symbol)
-            if fundamentals:
-                score = self.calculate_screening_score(fundamentals, criteria)
-                if score > 0:  # Only include stocks that meet some criteria
-                    fundamentals['screening_score'] = score
-                    results.append(fundamentals)
+        future, events = self.submit_screen(criteria)
+        while True:
+            done = future.done()
+            for kind, payload in drain_screen_events(events):
+                if kind == 'progress':
+                    completed, total, symbol = payload
+                    status_text.text(f"Analyzing {symbol}... ({completed}/{total})")
+                    progress_bar.progress(completed / total)
+                else:
+                    st.warning(payload)
+            if done:
+                break
+            wait([future], timeout=0.2)
         
         progress_bar.empty()
         status_text.empty()
         
-        # Sort by screening score
-        results.sort(key=lambda x: x['screening_score'], reverse=True)
-        return results
+        return future.result()
+    
+    def submit_screen(self, criteria) -> Tuple[Future, queue.Queue]:
+        """
+        Start a screen on the background executor
+        
+        Returns the job's Future (resolving to the screen_stocks DataFrame)
+        and a queue of ('progress', (done, total, symbol)) / ('warning',
+        message) events. The job never touches Streamlit; the caller drains
+        the queue on the script thread (see drain_screen_events).
+        """
+        events = queue.Queue()
+        return _SCREEN_EXECUTOR.submit(self._screen_impl, criteria, events), events
+    
+    def _screen_impl(self, criteria, events: queue.Queue) -> pd.DataFrame:
+        """Run the screen, pushing progress and warnings onto events"""
+        # No separate market-cap gate: the scorer uses info['marketCap'],
+        # which only the per-symbol .info fetch provides
+        universe = self.small_cap_universe
+        
+        fetched = [None] * len(universe)
+        futures = {
+            _FETCH_EXECUTOR.submit(self._fetch_fundamentals, symbol, False): i
+            for i, symbol in enumerate(universe)
+        }
+        for done, future in enumerate(as_completed(futures), start=1):
+            i = futures[future]
+            symbol = universe[i]
+            events.put(('progress', (done, len(universe), symbol)))
+            
+            fundamentals, error = future.result()
+            if error:
+                events.put(('warning', f"Could not fetch data for {symbol}: {error}"))
+            if fundamentals:
+                fetched[i] = fundamentals
+        
+        # Score everything in one vector pass (universe order keeps ties stable)
+        return self.screen_stocks_vectorized([f for f in fetched if f is not None], criteria)
+    
+    def screen_stocks_vectorized(self, fundamentals_list, criteria) -> pd.DataFrame:
+        """
+        Score a list of fundamentals dicts with column-wise masks
+        
+        Same points as calculate_screening_score; missing/None values never
+        earn points. Returns the rows that score > 0 as a DataFrame with a
+        'screening_score' column, sorted by score (ties keep input order).
+        """
+        if not fundamentals_list:
+            return pd.DataFrame()
+        
+        df = pd.DataFrame(fundamentals_list)
+        col = lambda name: _numeric_column(df, name)
+        
+        revenue_growth = col('revenue_growth')
+        peg_ratio = col('peg_ratio')
+        
+        score = (
+            2 * (revenue_growth >= criteria['revenue_growth_min']).astype('int8')
+            + ((revenue_growth >= criteria['revenue_growth_min']) & (revenue_growth >= 0.20)).astype('int8')
+            + 2 * (col('earnings_growth') >= criteria['eps_growth_min']).astype('int8')
+            + (col('profit_margin') >= criteria['profit_margin_min']).astype('int8')
+            + (col('debt_to_equity') <= criteria['debt_equity_max']).astype('int8')
+            + 2 * ((peg_ratio > 0) & (peg_ratio <= criteria['peg_ratio_max'])).astype('int8')
+            + (col('avg_volume') * col('current_price') >= criteria['min_volume_usd']).astype('int8')
+            + (col('free_cash_flow') > 0).astype('int8')
+        )
+        
+        # Market cap check (required)
+        in_range = col('market_cap').between(criteria['market_cap_min'], criteria['market_cap_max'])
+        score = score.where(in_range, 0)
+        
+        df['screening_score'] = score.astype(int)
+        passing = df[score.to_numpy() > 0]
+        return passing.sort_values('screening_score', ascending=False, kind='stable').reset_index(drop=True)
     
     def calculate_screening_score(self, fundamentals, criteria):
-        """Calculate screening score based on criteria"""
+        """
+        Calculate screening score based on criteria
+        
+        Expects a dict from get_stock_fundamentals, which always carries
+        every key, so fields are indexed directly.
+        """
         score = 0
         max_score = 10
         
         # Market cap check (required)
-        market_cap = fundamentals.get('market_cap', 0)
+        market_cap = fundamentals['market_cap']
         if not (criteria['market_cap_min'] <= market_cap <= criteria['market_cap_max']):
             return 0  # Fails basic market cap requirement
         
         # Revenue growth (2 points)
-        revenue_growth = fundamentals.get('revenue_growth', 0)
+        revenue_growth = fundamentals['revenue_growth']
         if revenue_growth >= criteria['revenue_growth_min']:
             score += 2
             # Bonus point for exceptional growth (>20%)
@@ -237,79 +389,92 @@ class SmallCapScreener:
                 score += 1
         
         # EPS growth (2 points)
-        earnings_growth = fundamentals.get('earnings_growth', 0)
+        earnings_growth = fundamentals['earnings_growth']
         if earnings_growth >= criteria['eps_growth_min']:
             score += 2
         
         # Profit margins (1 point)
-        profit_margin = fundamentals.get('profit_margin', 0)
+        profit_margin = fundamentals['profit_margin']
         if profit_margin >= criteria['profit_margin_min']:
             score += 1
         
         # Debt to equity (1 point)
-        debt_equity = fundamentals.get('debt_to_equity', 100)
+        debt_equity = fundamentals['debt_to_equity']
         if debt_equity <= criteria['debt_equity_max']:
             score += 1
         
         # PEG ratio (2 points)
-        peg_ratio = fundamentals.get('peg_ratio', 10)
+        peg_ratio = fundamentals['peg_ratio']
         if 0 < peg_ratio <= criteria['peg_ratio_max']:
             score += 2
         
         # Volume/Liquidity (1 point)
-        avg_volume = fundamentals.get('avg_volume', 0)
-        current_price = fundamentals.get('current_price', 0)
+        avg_volume = fundamentals['avg_volume']
+        current_price = fundamentals['current_price']
         daily_volume_usd = avg_volume * current_price
         if daily_volume_usd >= criteria['min_volume_usd']:
             score += 1
         
         # Cash flow positive (1 point)
-        free_cash_flow = fundamentals.get('free_cash_flow', 0)
+        free_cash_flow = fundamentals['free_cash_flow']
         if free_cash_flow > 0:
             score += 1
         
         return score
     
+    def top_picks(self, results, n: int = 3) -> List[dict]:
+        """First n result rows as dicts, with missing values as None"""
+        head = self._as_frame(results).head(n)
+        return head.astype(object).where(head.notna(), None).to_dict('records')
+    
+    def _as_frame(self, results) -> pd.DataFrame:
+        """Accept a results DataFrame or a legacy list of dicts"""
+        return results if isinstance(results, pd.DataFrame) else pd.DataFrame(results)
+    
     def format_screening_results(self, results):
         """Format screening results for display"""
-        if not results:
+        df = self._as_frame(results)
+        if df.empty:
             return pd.DataFrame()
         
-        display_data = []
-        for stock in results:
-            display_data.append({
-                'Symbol': stock['symbol'],
-                'Score': f"{stock['screening_score']}/10",
-                'Market Cap': f"${stock['market_cap']/1e9:.2f}B" if stock['market_cap'] > 0 else 'N/A',
-                'Revenue Growth': f"{stock['revenue_growth']*100:.1f}%" if stock['revenue_growth'] else 'N/A',
-                'EPS Growth': f"{stock['earnings_growth']*100:.1f}%" if stock['earnings_growth'] else 'N/A',
-                'Profit Margin': f"{stock['profit_margin']*100:.1f}%" if stock['profit_margin'] else 'N/A',
-                'PEG Ratio': f"{stock['peg_ratio']:.2f}" if stock['peg_ratio'] else 'N/A',
-                'P/E Ratio': f"{stock['trailing_pe']:.1f}" if stock['trailing_pe'] else 'N/A',
-                'Debt/Equity': f"{stock['debt_to_equity']:.1f}%" if stock['debt_to_equity'] else 'N/A',
-                'Current Price': f"${stock['current_price']:.2f}" if stock['current_price'] else 'N/A',
-            })
-        
-        return pd.DataFrame(display_data)
+        def fmt(name, template, scale=1.0, positive=False):
+            values = _numeric_column(df, name)
+            valid = values > 0 if positive else values.notna() & (values != 0)
+            return np.where(valid, (values * scale).map(template.format), 'N/A')
+        
+        return pd.DataFrame({
+            'Symbol': df['symbol'],
+            'Score': df['screening_score'].astype(str) + '/10',
+            'Market Cap': fmt('market_cap', '${:.2f}B', 1e-9, positive=True),
+            'Revenue Growth': fmt('revenue_growth', '{:.1f}%', 100),
+            'EPS Growth': fmt('earnings_growth', '{:.1f}%', 100),
+            'Profit Margin': fmt('profit_margin', '{:.1f}%', 100),
+            'PEG Ratio': fmt('peg_ratio', '{:.2f}'),
+            'P/E Ratio': fmt('trailing_pe', '{:.1f}'),
+            'Debt/Equity': fmt('debt_to_equity', '{:.1f}%'),
+            'Current Price': fmt('current_price', '${:.2f}'),
+        })
     
     def format_csv_export(self, results):
         """Format screening results for CSV export with proper number formatting"""
-        if not results:
+        df = self._as_frame(results)
+        if df.empty:
             return pd.DataFrame()
         
-        export_data = []
-        for stock in results:
-            export_data.append({
-                'Symbol': stock['symbol'],
-                'Score (out of 10)': stock['screening_score'],  # Plain number, not date format
-                'Market Cap ($B)': stock['market_cap']/1e9 if stock['market_cap'] > 0 else None,
-                'Revenue Growth (%)': stock['revenue_growth']*100 if stock['revenue_growth'] else None,
-                'EPS Growth (%)': stock['earnings_growth']*100 if stock['earnings_growth'] else None,
-                'Profit Margin (%)': stock['profit_margin']*100 if stock['profit_margin'] else None,
-                'PEG Ratio': stock['peg_ratio'] if stock['peg_ratio'] else None,
-                'P/E Ratio': stock['trailing_pe'] if stock['trailing_pe'] else None,
-                'Debt/Equity (%)': stock['debt_to_equity'] if stock['debt_to_equity'] else None,
-                'Current Price ($)': stock['current_price'] if stock['current_price'] else None,
-            })
-        
-        return pd.DataFrame(export_data)
\ No newline at end of file
+        def num(name, scale=1.0, positive=False):
+            values = _numeric_column(df, name)
+            valid = values > 0 if positive else values.notna() & (values != 0)
+            return (values * scale).where(valid)
+        
+        return pd.DataFrame({
+            'Symbol': df['symbol'],
+            'Score (out of 10)': df['screening_score'],  # Plain number, not date format
+            'Market Cap ($B)': num('market_cap', 1e-9, positive=True),
+            'Revenue Growth (%)': num('revenue_growth', 100),
+            'EPS Growth (%)': num('earnings_growth', 100),
+            'Profit Margin (%)': num('profit_margin', 100),
+            'PEG Ratio': num('peg_ratio'),
+            'P/E Ratio': num('trailing_pe'),
+            'Debt/Equity (%)': num('debt_to_equity'),
+            'Current Price ($)': num('current_price'),
+        })
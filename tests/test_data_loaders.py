@@ -0,0 +1,31 @@
+"""
+Unit tests for the IFO data loaders
+"""
+
+import pytest
+import sys
+import os
+from datetime import datetime
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from shared.data_loaders import InstitutionalDataLoader
+
+
+def test_holdings_blank_ticker_row_is_skipped(tmp_path):
+    """A row with no ticker does not break Z_H for the other tickers"""
+    csv_path = tmp_path / 'institutional_holdings.csv'
+    csv_path.write_text(
+        "ticker,quarter_end,inst_hold_pct\n"
+        "AAA,2024-06-30,100.0\n"
+        "AAA,2024-09-30,110.0\n"
+        "AAA,2024-12-31,110.0\n"
+        ",2024-12-31,50.0\n"
+    )
+    
+    loader = InstitutionalDataLoader(str(csv_path))
+    z_h, is_stale = loader.get_holdings_change('AAA', datetime(2025, 1, 15))
+    
+    assert z_h == pytest.approx(-0.7071, abs=1e-3)
+    assert is_stale is False
@@ -15,9 +15,9 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 from shared.institutional_flow import IFOEngine
 
 
-@pytest.fixture
+@pytest.fixture(scope='module')
 def ifo_engine():
-    """Create IFO engine for testing"""
+    """Create IFO engine for testing (stateless, so shared by the module)"""
     return IFOEngine('config/ifo.yaml')
 
 
@@ -45,7 +45,7 @@ class TestIFOValidation:
         # Check normalization: weights should sum to 1
         # With Phase 1A: RV=0.60, AD_slope=0.40
         expected_ifs = 0.60 * 1.5 + 0.40 * 0.8
-        assert abs(ifs_raw - expected_ifs) < 0.01
+        np.testing.assert_allclose(ifs_raw, expected_ifs, rtol=0, atol=0.01)
     
     def test_2_clipping_and_winsorization(self, ifo_engine):
         """
@@ -148,14 +148,13 @@ class TestIFOValidation:
         When High==Low, set MFM=0 via denominator max(High-Low, 1e-6)
         """
         # Create OHLCV data with High==Low (doji candle)
-        dates = pd.date_range('2024-01-01', periods=120, freq='D')
         ohlcv = pd.DataFrame({
             'Open': [100.0] * 120,
             'High': [100.0] * 120,  # High == Low
             'Low': [100.0] * 120,
             'Close': [100.0] * 120,
             'Volume': [1000000] * 120
-        }, index=dates)
+        })
         
         # Should not raise division by zero
         try:
@@ -180,23 +179,125 @@ class TestIFOComponents:
     
     def test_ad_slope_calculation(self, ifo_engine):
         """Test A/D slope calculation"""
-        # Create uptrending OHLCV
-        dates = pd.date_range('2024-01-01', periods=120, freq='D')
+        # Create uptrending OHLCV; closes sit above the (H+L)/2 midpoint so
+        # every bar accumulates (at the midpoint MFM = 0 and A/D is flat)
         closes = np.linspace(90, 110, 120)
         
         ohlcv = pd.DataFrame({
             'Open': closes - 1,
-            'High': closes + 1,
-            'Low': closes - 1,
+            'High': closes + 0.5,
+            'Low': closes - 1.5,
             'Close': closes,
             'Volume': [1000000] * 120
-        }, index=dates)
+        })
         
         ad_slope = ifo_engine.calculate_ad_slope(ohlcv)
         
         assert ad_slope > 0, "AD_slope should be positive for uptrend"
         assert -2.0 <= ad_slope <= 2.0, "AD_slope should be clipped to [-2, +2]"
     
+    def test_ifs_raw_batch_matches_scalar(self, ifo_engine):
+        """Batched IFS scoring agrees with the per-ticker path"""
+        z_h = np.array([np.nan, 0.5, np.nan, np.nan])
+        rv = np.array([1.5, np.nan, 10.0, np.nan])
+        ad_slope = np.array([0.8, np.nan, 5.0, np.nan])
+        z_dtc = np.array([np.nan, 2.0, np.nan, np.nan])
+        
+        batch = ifo_engine.calculate_ifs_raw_batch(z_h, rv, ad_slope, z_dtc)
+        
+        for i in range(len(batch)):
+            scalar, _ = ifo_engine.calculate_ifs_raw(z_h[i], rv[i], ad_slope[i], z_dtc[i])
+            assert batch[i] == pytest.approx(scalar)
+        assert -3.0 <= batch.min() and batch.max() <= 3.0
+    
+    def test_smooth_batch_matches_series(self, ifo_engine):
+        """Batched EMA smoothing agrees with smooth_ifs and pandas ewm"""
+        raw = np.random.default_rng(2).normal(size=(3, 200))
+        raw[1, 50] = np.nan
+        alpha = 1 - np.exp(np.log(0.5) / ifo_engine.ema_hl)
+        
+        batch = ifo_engine.smooth_ifs_batch(raw)
+        
+        for i in range(raw.shape[0]):
+            single = ifo_engine.smooth_ifs(pd.Series(raw[i]))
+            expected = pd.Series(raw[i]).ewm(alpha=alpha, adjust=False).mean()
+            np.testing.assert_allclose(batch[i], single.to_numpy())
+            np.testing.assert_allclose(batch[i], expected.to_numpy())
+    
+    def test_rescale_batch_matches_series(self, ifo_engine):
+        """Batched winsor/rescale agrees with the single-series path"""
+        smoothed = np.random.default_rng(0).normal(size=(3, 300))
+        
+        batch = ifo_engine.rescale_ifs_batch(smoothed)
+        
+        for i in range(smoothed.shape[0]):
+            single = ifo_engine.rescale_ifs(pd.Series(smoothed[i]))
+            np.testing.assert_allclose(batch[i], single.to_numpy())
+        assert batch.min() >= -2.0 and batch.max() <= 2.0
+    
+    def test_rescale_all_nan_window_stays_nan(self, ifo_engine):
+        """Missing data is not rescaled to a neutral 0.0"""
+        smoothed = np.random.default_rng(1).normal(size=(2, 300))
+        smoothed[1] = np.nan
+        
+        batch = ifo_engine.rescale_ifs_batch(smoothed)
+        
+        assert np.isnan(batch[1]).all()
+        assert np.isfinite(batch[0]).all()
+        assert ifo_engine.rescale_ifs(pd.Series(smoothed[1])).isna().all()
+    
+    def test_feature_batch_matches_scalar(self, ifo_engine):
+        """Universe-wide RV / AD_slope agree with the per-ticker path"""
+        rng = np.random.default_rng(3)
+        ohlcvs = []
+        for n in (80, 120, 250):
+            closes = 100 + rng.standard_normal(n).cumsum()
+            ohlcvs.append(pd.DataFrame({
+                'High': closes + rng.uniform(0, 2, n),
+                'Low': closes - rng.uniform(0, 2, n),
+                'Close': closes,
+                'Volume': rng.integers(100000, 5000000, n).astype(float)
+            }))
+        ohlcvs[2].loc[240, 'Volume'] = np.nan
+
+        ad_slope = ifo_engine.calculate_ad_slope_batch(ohlcvs)
+        rv = ifo_engine.calculate_rv_batch([df['Volume'] for df in ohlcvs])
+
+        for i, df in enumerate(ohlcvs):
+            np.testing.assert_allclose(ad_slope[i], ifo_engine.calculate_ad_slope(df), atol=1e-12)
+            np.testing.assert_allclose(rv[i], ifo_engine.calculate_rv(df['Volume']), atol=1e-12)
+
+    def test_state_update_matches_full_history(self, ifo_engine):
+        """Incremental RV / AD_slope agree with recomputing from the full history"""
+        rng = np.random.default_rng(1)
+        closes = 100 + rng.standard_normal(300).cumsum()
+        ohlcv = pd.DataFrame({
+            'High': closes + rng.uniform(0, 2, 300),
+            'Low': closes - rng.uniform(0, 2, 300),
+            'Close': closes,
+            'Volume': rng.integers(100000, 5000000, 300).astype(float)
+        })
+        ohlcv.loc[150, 'Volume'] = np.nan
+        
+        state = ifo_engine.new_state()
+        for i in range(len(ohlcv)):
+            rv, ad_slope = ifo_engine.update(state, ohlcv.iloc[i])
+            history = ohlcv.iloc[:i + 1]
+            np.testing.assert_allclose(rv, ifo_engine.calculate_rv(history['Volume']), atol=1e-9)
+            np.testing.assert_allclose(ad_slope, ifo_engine.calculate_ad_slope(history), atol=1e-9)
+    
+    def test_adjust_and_scale_matches_scalar(self, ifo_engine):
+        """Fused posterior/Kelly path agrees with adjust_posterior and scale_kelly"""
+        p_bull = np.array([0.0, 0.3, 0.6, 0.999, 1.0])
+        kelly = np.array([0.1, 0.2, 0.2, 0.3, 0.05])
+        ifs = np.array([-2.0, -0.5, 0.0, 1.0, 2.0])
+        
+        p_adj, kelly_adj = ifo_engine.adjust_and_scale(p_bull, kelly, ifs)
+        
+        for i in range(len(ifs)):
+            assert p_adj[i] == pytest.approx(ifo_engine.adjust_posterior(p_bull[i], ifs[i]))
+            assert kelly_adj[i] == pytest.approx(ifo_engine.scale_kelly(kelly[i], ifs[i]))
+    
     def test_decision_bands(self, ifo_engine):
         """Test decision band logic"""
         # Test primary bands
@@ -210,6 +311,29 @@ class TestIFOComponents:
         
         # Test tie-breaker: allow Increase if P_bull_adj > 0.80 and IFS >= 0
         assert ifo_engine.get_decision(0.5, 0.85) == 'Increase'
+    
+    def test_decision_batch_matches_scalar(self, ifo_engine):
+        """Vectorized decision bands agree with get_decision"""
+        ifs = np.array([1.5, 0.5, -0.5, -1.5, 1.0, 0.5, 0.0, -1.0, np.nan])
+        p_bull = np.array([0.65, 0.65, 0.65, 0.65, 0.30, 0.85, 0.85, 0.85, 0.65])
+        
+        decisions = ifo_engine.get_decision_batch(ifs, p_bull)
+        
+        expected = [ifo_engine.get_decision(i, p) for i, p in zip(ifs, p_bull)]
+        assert list(decisions) == expected
+    
+    def test_decision_codes_panel(self, ifo_engine):
+        """Decision codes broadcast over a ticker × bar panel"""
+        rng = np.random.default_rng(4)
+        ifs = rng.uniform(-2.5, 2.5, size=(4, 50))
+        p_bull = rng.uniform(0.2, 0.95, size=(4, 1))
+        
+        codes = ifo_engine.get_decision_codes(ifs, p_bull)
+        
+        assert codes.shape == ifs.shape and codes.dtype == np.int8
+        labels = ['Exit', 'Reduce', 'Maintain', 'Increase']
+        for (i, j), code in np.ndenumerate(codes):
+            assert labels[code] == ifo_engine.get_decision(ifs[i, j], p_bull[i, 0])
 
 
 if __name__ == '__main__':
@@ -0,0 +1,32 @@
+"""
+Unit tests for the CSV-based ticker universe loader
+"""
+
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from shared.universe_loader import UniverseLoader
+
+
+def test_non_canonical_flags_do_not_empty_universe(tmp_path):
+    """Hand-edited flag spellings are mapped instead of failing the load"""
+    csv_path = tmp_path / 'universe.csv'
+    csv_path.write_text(
+        "ticker,exchange,is_adr,is_etf,priority\n"
+        "AAA,NYSE,false,false,A\n"
+        "BBB,NYSE,yes,false,A\n"
+        "CCC,NASDAQ,x,,B\n"
+        "DDD,NASDAQ,False,Y,B\n"
+    )
+    
+    loader = UniverseLoader(str(tmp_path / 'universe_config.json'))
+    loader.csv_path = str(csv_path)
+    tickers, stats = loader.load()
+    
+    assert 'error' not in stats
+    assert tickers == ['AAA', 'CCC']
+    reasons = {e['ticker']: e['reason'] for e in stats['exclusions']}
+    assert reasons == {'BBB': 'ADR excluded', 'DDD': 'ETF (column)'}
@@ -0,0 +1,33 @@
+"""
+pytest entry points for validate_ifo's checks
+Each check (and each decision-table row) is its own test, so the suite
+can be sharded with pytest-xdist
+"""
+
+import pytest
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from shared.institutional_flow import IFOEngine
+from validate_ifo import _CHECKS, DECISION_CASES
+
+
+@pytest.fixture(scope='session')
+def engine():
+    """IFO engine on the config validate_ifo uses"""
+    return IFOEngine('config/ifo.json')
+
+
+@pytest.mark.parametrize('check', _CHECKS, ids=lambda check: check.__name__.removeprefix('_check_'))
+def test_validation_check(engine, check):
+    """Each validate_ifo check passes on its own"""
+    check(engine, lambda *args, **kwargs: None)
+
+
+@pytest.mark.parametrize("ifs,p,expected", DECISION_CASES)
+def test_decision_case(engine, ifs, p, expected):
+    """Each row of the Test 5 decision table"""
+    assert engine.get_decision(ifs, p) == expected
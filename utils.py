@@ -4,35 +4,64 @@ Utility functions for the trading platform
 
 import pandas as pd
 import numpy as np
+import math
+import os
+import pickle
+import shutil
+import tempfile
+import threading
+from functools import lru_cache
 from datetime import datetime, timedelta
 import streamlit as st
 import yfinance as yf
 
+# On-disk cache for slow Yahoo fetches; one subdirectory per calendar day
+YF_DISK_CACHE_DIR = os.path.join('.cache', 'yf')
+
+# Day whose stale siblings this process has already pruned
+_disk_cache_pruned_day = None
+_disk_cache_prune_lock = threading.Lock()
+
+def _not_finite(value):
+    """True for None/NaN/NA/inf; one C call for ordinary numbers"""
+    try:
+        return not math.isfinite(value)
+    except TypeError:
+        return value is None or pd.isna(value)
+
 def format_percentage(value, decimals=2):
     """Format a decimal as a percentage"""
-    if pd.isna(value) or np.isinf(value):
+    if _not_finite(value):
         return "N/A"
     return f"{value:.{decimals}%}"
 
 def format_number(value, decimals=2):
     """Format a number with specified decimal places"""
-    if pd.isna(value) or np.isinf(value):
+    if _not_finite(value):
         return "N/A"
     return f"{value:.{decimals}f}"
 
 def validate_date_range(start_date, end_date):
     """Validate date range inputs"""
-    if start_date >= end_date:
+    return _validate_date_range_ordinals(
+        start_date.toordinal(), end_date.toordinal(), datetime.now().date().toordinal()
+    )
+
+@lru_cache(maxsize=256)
+def _validate_date_range_ordinals(start_ord, end_ord, today_ord):
+    """validate_date_range on day ordinals (hashable, so results are memoized)"""
+    if start_ord >= end_ord:
         raise ValueError("Start date must be before end date")
     
-    if end_date > datetime.now().date():
+    if end_ord > today_ord:
         raise ValueError("End date cannot be in the future")
     
-    if (end_date - start_date).days < 30:
+    if end_ord - start_ord < 30:
         raise ValueError("Date range must be at least 30 days")
     
     return True
 
+@lru_cache(maxsize=256)
 def calculate_trading_days(start_date, end_date):
     """Calculate approximate number of trading days"""
     total_days = (end_date - start_date).days
@@ -40,12 +69,19 @@ def calculate_trading_days(start_date, end_date):
 
 def clean_numeric_data(data, fill_value=0):
     """Clean numeric data by handling NaN and infinite values"""
-    if isinstance(data, pd.Series):
-        data = data.fillna(fill_value)
-        data = data.replace([np.inf, -np.inf], fill_value)
-    elif isinstance(data, pd.DataFrame):
-        data = data.fillna(fill_value)
-        data = data.replace([np.inf, -np.inf], fill_value)
+    if isinstance(data, (pd.Series, pd.DataFrame)):
+        dtypes = [data.dtype] if isinstance(data, pd.Series) else list(data.dtypes)
+        if dtypes and all(dtype == dtypes[0] for dtype in dtypes) and dtypes[0].kind == 'f':
+            # Homogeneous float data: one nan_to_num pass over a single copy
+            values = np.nan_to_num(data.to_numpy(copy=True), copy=False,
+                                   nan=fill_value, posinf=fill_value, neginf=fill_value)
+            if isinstance(data, pd.Series):
+                data = pd.Series(values, index=data.index, name=data.name)
+            else:
+                data = pd.DataFrame(values, index=data.index, columns=data.columns)
+        else:
+            data = data.fillna(fill_value)
+            data = data.replace([np.inf, -np.inf], fill_value)
     elif isinstance(data, np.ndarray):
         data = np.nan_to_num(data, nan=fill_value, posinf=fill_value, neginf=fill_value)
     
@@ -80,11 +116,38 @@ def calculate_annualized_metrics(returns, periods_per_year=252):
 
 def safe_divide(numerator, denominator, default=0):
     """Safely divide two numbers, returning default if denominator is zero"""
-    if denominator == 0 or pd.isna(denominator) or np.isinf(denominator):
+    if _not_finite(denominator) or denominator == 0:
         return default
     return numerator / denominator
 
 @st.cache_data(ttl=3600)
+def get_stock_data_cached_multi(tickers: tuple, start_date: str, end_date: str) -> dict:
+    """
+    Fetch stock data for several tickers in one threaded download (1-hour cache TTL)
+    
+    Args:
+        tickers: Tuple of stock ticker symbols (a tuple, so it can be a cache key)
+        start_date: Start date (YYYY-MM-DD format or datetime)
+        end_date: End date (YYYY-MM-DD format or datetime)
+        
+    Returns:
+        Dict of ticker -> DataFrame with stock price data (empty if unavailable)
+    """
+    data = yf.download(list(tickers), start=start_date, end=end_date, progress=False,
+                       group_by='ticker', threads=True)
+    
+    frames = {}
+    for ticker in tickers:
+        frame = pd.DataFrame()
+        if data is not None and not data.empty and isinstance(data.columns, pd.MultiIndex):
+            level0 = data.columns.get_level_values(0)
+            key = ticker if ticker in level0 else ticker.upper()
+            if key in level0:
+                # Rows for dates only other tickers traded are all-NaN here
+                frame = data[key].dropna(how='all')
+        frames[ticker] = frame
+    return frames
+
 def get_stock_data_cached(ticker: str, start_date: str, end_date: str) -> pd.DataFrame:
     """
     Fetch stock data with 1-hour cache TTL to prevent stale data
@@ -97,18 +160,79 @@ def get_stock_data_cached(ticker: str, start_date: str, end_date: str) -> pd.Dat
     Returns:
         DataFrame with stock price data
     """
-    data = yf.download(ticker, start=start_date, end=end_date, progress=False)
-    if data is None or data.empty:
-        return pd.DataFrame()
-    return data
+    return get_stock_data_cached_multi((ticker,), start_date, end_date)[ticker]
+
+def disk_cached(kind: str, key: str, fetch):
+    """
+    Return fetch() through a per-day pickle cache under YF_DISK_CACHE_DIR
+    
+    Entries live in <dir>/<YYYY-MM-DD>/<kind>/<key>.pkl, so they expire at
+    midnight and survive app restarts; earlier days are pruned once per day
+    per process. Empty results (None, {}, empty frames) are returned but
+    not stored, so a failed fetch is retried next time. Cache I/O errors
+    fall back to fetch().
+    """
+    day = datetime.now().strftime('%Y-%m-%d')
+    day_dir = os.path.join(YF_DISK_CACHE_DIR, day)
+    path = os.path.join(day_dir, kind, f"{key.replace(os.sep, '_')}.pkl")
+    
+    try:
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        pass
+    
+    value = fetch()
+    if _is_empty(value):
+        return value
+    
+    _prune_disk_cache(day)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        
+        # Write-then-rename so concurrent readers never see a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+    
+    return value
+
+def _is_empty(value) -> bool:
+    """True for None, empty containers and empty pandas objects"""
+    if value is None:
+        return True
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return value.empty
+    if isinstance(value, (dict, list, tuple)):
+        return not value
+    return False
+
+def _prune_disk_cache(today: str):
+    """Remove earlier days' cache directories (never today's), once per day"""
+    global _disk_cache_pruned_day
+    with _disk_cache_prune_lock:
+        if _disk_cache_pruned_day == today:
+            return
+        _disk_cache_pruned_day = today
+        try:
+            old_days = os.listdir(YF_DISK_CACHE_DIR)
+        except OSError:
+            return
+        for old_day in old_days:
+            if old_day != today:
+                shutil.rmtree(os.path.join(YF_DISK_CACHE_DIR, old_day), ignore_errors=True)
 
 def clear_stock_data_cache():
     """Clear the stock data cache to force fresh data fetch"""
-    get_stock_data_cached.clear()
+    get_stock_data_cached_multi.clear()
+    shutil.rmtree(YF_DISK_CACHE_DIR, ignore_errors=True)
     
 def format_currency(value, decimals=2):
     """Format a value as currency (USD)"""
-    if pd.isna(value) or np.isinf(value):
+    if _not_finite(value):
         return "N/A"
     if value >= 1_000_000:
         return f"${value/1_000_000:.{decimals}f}M"
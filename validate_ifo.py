@@ -2,134 +2,264 @@
 Quick validation script for IFO system (without pytest dependency)
 """
 
+import functools
+import io
+import itertools
 import sys
-import pandas as pd
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional, Sequence, Tuple
 import numpy as np
 from shared.institutional_flow import IFOEngine
 
-def validate_ifo():
-    """Run basic validation tests"""
-    print("=" * 60)
-    print("IFO System Validation")
-    print("=" * 60)
+
+def _check_ifs_raw(engine, emit):
+    """Tests 1-2: renormalization and clipping (one batched call)"""
+    missing = np.full(2, np.nan)
+    ifs_batch = engine.calculate_ifs_raw_batch(missing, np.array([1.5, 10.0]), np.array([0.8, 5.0]), missing)
+    
+    # Test 1: Weight renormalization
+    emit("Test 1: Weight Renormalization")
+    ifs_raw = ifs_batch[0]
+    _, components = engine.calculate_ifs_raw(rv=1.5, ad_slope=0.8)
+    emit(f"  IFS_raw = {ifs_raw:.3f}")
+    emit(f"  has_RV = {components['has_RV']}")
+    emit(f"  has_ADslope = {components['has_ADslope']}")
+    emit(f"  has_ZH = {components['has_ZH']}")
+    emit(f"  has_ZDTC = {components['has_ZDTC']}")
+    expected = 0.60 * 1.5 + 0.40 * 0.8
+    np.testing.assert_allclose(ifs_raw, expected, rtol=0, atol=0.01)
+    emit("  ✓ PASSED")
+    emit()
+    
+    # Test 2: Clipping
+    emit("Test 2: IFS_raw Clipping to [-3, +3]")
+    ifs_raw_extreme = ifs_batch[1]
+    emit(f"  Extreme inputs (rv=10, ad_slope=5)")
+    emit(f"  IFS_raw (clipped) = {ifs_raw_extreme:.3f}")
+    assert -3.0 <= ifs_raw_extreme <= 3.0
+    emit("  ✓ PASSED")
+    emit()
+
+
+def _check_posterior_and_kelly(engine, emit):
+    """Tests 3-4: one fused posterior/Kelly call over IFS = +1, -1"""
+    p_bull_raw = 0.60
+    kelly_base = 0.20
+    p_adj_batch, kelly_batch = engine.adjust_and_scale(p_bull_raw, kelly_base, np.array([1.0, -1.0]))
+    
+    # Test 3: Posterior adjustment
+    emit("Test 3: Posterior Adjustment (logit-shift)")
+    ifs_smoothed = 1.0
+    p_bull_adj = p_adj_batch[0]
+    emit(f"  P_bull_raw = {p_bull_raw:.3f}")
+    emit(f"  IFS_smoothed = {ifs_smoothed:.3f}")
+    emit(f"  P_bull_adj = {p_bull_adj:.3f}")
+    assert p_bull_adj > p_bull_raw, "Positive IFS should increase posterior"
+    emit("  ✓ PASSED")
+    emit()
+    
+    # Test 4: Kelly scaling
+    emit("Test 4: Kelly Scaling")
+    kelly_adj_pos, kelly_adj_neg = kelly_batch
+    emit(f"  kelly_base = {kelly_base:.3f}")
+    emit(f"  kelly_adj (IFS=+1.0) = {kelly_adj_pos:.3f}")
+    emit(f"  kelly_adj (IFS=-1.0) = {kelly_adj_neg:.3f}")
+    assert 0 <= kelly_adj_pos <= engine.K_max
+    assert 0 <= kelly_adj_neg <= engine.K_max
+    emit("  ✓ PASSED")
+    emit()
+
+
+# Test 5 table: (IFS_smoothed, P_bull_adj, expected decision)
+DECISION_CASES = [
+    (1.5, 0.65, 'Increase'),
+    (0.5, 0.65, 'Maintain'),
+    (-0.5, 0.65, 'Reduce'),
+    (-1.5, 0.65, 'Exit'),
+    (1.0, 0.30, 'Exit'),  # Tie-breaker: force Exit
+    (0.5, 0.85, 'Increase'),  # Tie-breaker: allow Increase
+]
+
+
+def _check_decision_bands(engine, emit):
+    """Test 5: decision bands and tie-breakers"""
+    emit("Test 5: Decision Bands")
+    decisions = DECISION_CASES
+    
+    ifs_arr = np.array([row[0] for row in decisions])
+    p_bull_arr = np.array([row[1] for row in decisions])
+    batch = engine.get_decision_batch(ifs_arr, p_bull_arr)
+    
+    expected = np.array([row[2] for row in decisions])
+    scalar = np.array([engine.get_decision(ifs, p_bull) for ifs, p_bull, _ in decisions])
+    
+    for (ifs, p_bull, expected_decision), decision in zip(decisions, batch):
+        status = "✓" if decision == expected_decision else "✗"
+        emit(f"  {status} IFS={ifs:+.1f}, P_bull={p_bull:.2f} → {decision} (expected {expected_decision})")
+    
+    # All rows checked at once (batch vs scalar path, then vs expected)
+    np.testing.assert_array_equal(np.asarray(batch), scalar)
+    np.testing.assert_array_equal(np.asarray(batch), expected)
+    emit("  ✓ ALL PASSED")
+    emit()
+
+
+def _check_rv(engine, emit):
+    """Test 6: relative volume z-score"""
+    emit("Test 6: Relative Volume Calculation")
+    volumes = np.empty(100, dtype=np.int64)
+    volumes[:95] = 1_000_000
+    volumes[95:] = 1_500_000
+    rv = engine.calculate_rv_array(volumes)
+    emit(f"  Normal vol: 1M, Spike vol: 1.5M")
+    emit(f"  RV z-score = {rv:.3f}")
+    assert rv > 0, "RV should be positive for volume spike"
+    emit("  ✓ PASSED")
+    emit()
+
+
+def _check_ad_slope(engine, emit):
+    """Test 7: A/D slope on an uptrend"""
+    emit("Test 7: A/D Slope Calculation")
+    # float32 is plenty for a linear ramp; the kernel accumulates in float64.
+    # Closes sit above the (H+L)/2 midpoint, so every bar accumulates
+    # (a close exactly at the midpoint gives MFM = 0 and a flat A/D line)
+    closes = np.linspace(90, 110, 120, dtype=np.float32)
+    ad_slope = engine.calculate_ad_slope_array(
+        high=closes + 0.5,
+        low=closes - 1.5,
+        close=closes,
+        volume=np.full(120, 1_000_000, dtype=np.int64)
+    )
+    emit(f"  Uptrend: 90 → 110 over 120 days")
+    emit(f"  AD_slope = {ad_slope:.3f}")
+    assert ad_slope > 0, "AD_slope should be positive for uptrend"
+    assert -2.0 <= ad_slope <= 2.0, "AD_slope should be clipped"
+    emit("  ✓ PASSED")
+    emit()
+
+
+def _check_smoothing(engine, emit):
+    """Test 8: EMA smoothing decays with the configured half-life"""
+    emit("Test 8: IFS Smoothing (EMA half-life)")
+    # Unit step from 0: the gap left after n bars is 0.5 ** (n / ema_hl)
+    n_bars = int(np.ceil(4 * engine.ema_hl)) + 1
+    step = np.ones((1, n_bars))
+    step[0, 0] = 0.0
+    smoothed = engine.smooth_ifs_batch(step)[0]
+    
+    gap = 1.0 - smoothed[1:]
+    expected = 0.5 ** (np.arange(1, n_bars) / engine.ema_hl)
+    half_life_bar = int(round(engine.ema_hl))
+    emit(f"  Unit step, half-life = {engine.ema_hl} days")
+    emit(f"  IFS_smoothed after {half_life_bar} days = {smoothed[half_life_bar]:.3f}")
+    np.testing.assert_allclose(gap, expected, rtol=1e-9, atol=1e-12)
+    emit("  ✓ PASSED")
+    emit()
+
+
+# Independent checks, reported in this order
+_CHECKS = (
+    _check_ifs_raw,
+    _check_posterior_and_kelly,
+    _check_decision_bands,
+    _check_rv,
+    _check_ad_slope,
+    _check_smoothing,
+)
+
+
+def _run_check(check, engine):
+    """Run one check into its own buffer; returns (output, exception or None)"""
+    out = io.StringIO()
+    try:
+        check(engine, functools.partial(print, file=out))
+        return out.getvalue(), None
+    except Exception as e:
+        return out.getvalue(), e
+
+
+def validate_ifo(
+    gamma: Optional[float] = None,
+    beta: Optional[float] = None,
+    K_max: Optional[float] = None,
+    ema_hl: Optional[float] = None
+):
+    """
+    Run basic validation tests
+    
+    Any parameter given overrides the value loaded from config/ifo.json,
+    so the same checks can be run against other settings.
+    """
+    # Collect output and write it once at the end (not one write per line)
+    out = io.StringIO()
+    emit = functools.partial(print, file=out)
+    
+    emit("=" * 60)
+    emit("IFO System Validation")
+    emit("=" * 60)
     
     try:
         engine = IFOEngine('config/ifo.json')
-        print("✓ IFO Engine initialized successfully")
-        print(f"  - Gamma: {engine.gamma}")
-        print(f"  - Beta: {engine.beta}")
-        print(f"  - K_max: {engine.K_max}")
-        print(f"  - EMA half-life: {engine.ema_hl} days")
-        print()
-        
-        # Test 1: Weight renormalization
-        print("Test 1: Weight Renormalization")
-        ifs_raw, components = engine.calculate_ifs_raw(rv=1.5, ad_slope=0.8)
-        print(f"  IFS_raw = {ifs_raw:.3f}")
-        print(f"  has_RV = {components['has_RV']}")
-        print(f"  has_ADslope = {components['has_ADslope']}")
-        print(f"  has_ZH = {components['has_ZH']}")
-        print(f"  has_ZDTC = {components['has_ZDTC']}")
-        expected = 0.60 * 1.5 + 0.40 * 0.8
-        assert abs(ifs_raw - expected) < 0.01, f"Expected {expected:.3f}, got {ifs_raw:.3f}"
-        print("  ✓ PASSED")
-        print()
-        
-        # Test 2: Clipping
-        print("Test 2: IFS_raw Clipping to [-3, +3]")
-        ifs_raw_extreme, _ = engine.calculate_ifs_raw(rv=10.0, ad_slope=5.0)
-        print(f"  Extreme inputs (rv=10, ad_slope=5)")
-        print(f"  IFS_raw (clipped) = {ifs_raw_extreme:.3f}")
-        assert -3.0 <= ifs_raw_extreme <= 3.0
-        print("  ✓ PASSED")
-        print()
+        overrides = {'gamma': gamma, 'beta': beta, 'K_max': K_max, 'ema_hl': ema_hl}
+        for name, value in overrides.items():
+            if value is not None:
+                setattr(engine, name, value)
+        emit("✓ IFO Engine initialized successfully")
+        emit(f"  - Gamma: {engine.gamma}")
+        emit(f"  - Beta: {engine.beta}")
+        emit(f"  - K_max: {engine.K_max}")
+        emit(f"  - EMA half-life: {engine.ema_hl} days")
+        emit()
         
-        # Test 3: Posterior adjustment
-        print("Test 3: Posterior Adjustment (logit-shift)")
-        p_bull_raw = 0.60
-        ifs_smoothed = 1.0
-        p_bull_adj = engine.adjust_posterior(p_bull_raw, ifs_smoothed)
-        print(f"  P_bull_raw = {p_bull_raw:.3f}")
-        print(f"  IFS_smoothed = {ifs_smoothed:.3f}")
-        print(f"  P_bull_adj = {p_bull_adj:.3f}")
-        assert p_bull_adj > p_bull_raw, "Positive IFS should increase posterior"
-        print("  ✓ PASSED")
-        print()
+        results = [_run_check(check, engine) for check in _CHECKS]
         
-        # Test 4: Kelly scaling
-        print("Test 4: Kelly Scaling")
-        kelly_base = 0.20
-        kelly_adj_pos = engine.scale_kelly(kelly_base, 1.0)
-        kelly_adj_neg = engine.scale_kelly(kelly_base, -1.0)
-        print(f"  kelly_base = {kelly_base:.3f}")
-        print(f"  kelly_adj (IFS=+1.0) = {kelly_adj_pos:.3f}")
-        print(f"  kelly_adj (IFS=-1.0) = {kelly_adj_neg:.3f}")
-        assert 0 <= kelly_adj_pos <= engine.K_max
-        assert 0 <= kelly_adj_neg <= engine.K_max
-        print("  ✓ PASSED")
-        print()
+        for text, error in results:
+            out.write(text)
+            if error is not None:
+                raise error
         
-        # Test 5: Decision bands
-        print("Test 5: Decision Bands")
-        decisions = [
-            (1.5, 0.65, 'Increase'),
-            (0.5, 0.65, 'Maintain'),
-            (-0.5, 0.65, 'Reduce'),
-            (-1.5, 0.65, 'Exit'),
-            (1.0, 0.30, 'Exit'),  # Tie-breaker: force Exit
-            (0.5, 0.85, 'Increase'),  # Tie-breaker: allow Increase
-        ]
-        
-        for ifs, p_bull, expected_decision in decisions:
-            decision = engine.get_decision(ifs, p_bull)
-            status = "✓" if decision == expected_decision else "✗"
-            print(f"  {status} IFS={ifs:+.1f}, P_bull={p_bull:.2f} → {decision} (expected {expected_decision})")
-            assert decision == expected_decision
-        print("  ✓ ALL PASSED")
-        print()
-        
-        # Test 6: RV calculation
-        print("Test 6: Relative Volume Calculation")
-        volumes = pd.Series([1000000] * 95 + [1500000] * 5)
-        rv = engine.calculate_rv(volumes)
-        print(f"  Normal vol: 1M, Spike vol: 1.5M")
-        print(f"  RV z-score = {rv:.3f}")
-        assert rv > 0, "RV should be positive for volume spike"
-        print("  ✓ PASSED")
-        print()
-        
-        # Test 7: A/D slope calculation
-        print("Test 7: A/D Slope Calculation")
-        dates = pd.date_range('2024-01-01', periods=120, freq='D')
-        closes = np.linspace(90, 110, 120)
-        ohlcv = pd.DataFrame({
-            'Open': closes - 1,
-            'High': closes + 1,
-            'Low': closes - 1,
-            'Close': closes,
-            'Volume': [1000000] * 120
-        }, index=dates)
-        
-        ad_slope = engine.calculate_ad_slope(ohlcv)
-        print(f"  Uptrend: 90 → 110 over 120 days")
-        print(f"  AD_slope = {ad_slope:.3f}")
-        assert ad_slope > 0, "AD_slope should be positive for uptrend"
-        assert -2.0 <= ad_slope <= 2.0, "AD_slope should be clipped"
-        print("  ✓ PASSED")
-        print()
-        
-        print("=" * 60)
-        print("✓ ALL VALIDATION TESTS PASSED!")
-        print("=" * 60)
+        emit("=" * 60)
+        emit("✓ ALL VALIDATION TESTS PASSED!")
+        emit("=" * 60)
+        sys.stdout.write(out.getvalue())
         return True
         
     except Exception as e:
-        print(f"✗ VALIDATION FAILED: {e}")
-        import traceback
+        emit(f"✗ VALIDATION FAILED: {e}")
+        sys.stdout.write(out.getvalue())
+        sys.stdout.flush()
         traceback.print_exc()
         return False
 
 
+def _validate_params(params: Tuple[float, float, float, float]) -> bool:
+    """validate_ifo for one (gamma, beta, K_max, ema_hl) tuple (picklable for workers)"""
+    return validate_ifo(*params)
+
+
+def validate_ifo_grid(
+    gammas: Sequence[float],
+    betas: Sequence[float],
+    k_maxes: Sequence[float],
+    half_lives: Sequence[float],
+    max_workers: Optional[int] = None
+) -> Dict[Tuple[float, float, float, float], bool]:
+    """
+    Run validate_ifo over every (gamma, beta, K_max, ema_hl) combination
+    
+    Combinations run in separate processes (one engine each, default
+    worker count = CPU count); each run writes its report in one block.
+    
+    Returns:
+        {(gamma, beta, K_max, ema_hl): passed}
+    """
+    params = list(itertools.product(gammas, betas, k_maxes, half_lives))
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return dict(zip(params, executor.map(_validate_params, params)))
+
+
 if __name__ == '__main__':
     success = validate_ifo()
     sys.exit(0 if success else 1)